@@ -0,0 +1,154 @@
+"""
+Attack tables for every kind of piece, built once at import time.
+
+Each table is indexed by square number (row * 8 + col) and holds a bitboard of the destination
+squares, so move generation only needs to mask the table entry against the board's occupancy.
+Pawn tables are additionally indexed by colour: 0 for white, 1 for black.
+
+Sliding pieces use precomputed rays: the attacks along a ray are the whole ray, minus the part of
+the same ray lying beyond the first blocker. Rays pointing towards higher square numbers find their
+first blocker with the lowest set bit, the others with the highest set bit.
+"""
+
+from chessington.engine.bitboard import BOARD_SIZE
+
+KNIGHT_OFFSETS = [(-2, -1), (-1, -2), (1, -2), (2, -1), (2, 1), (1, 2), (-1, 2), (-2, 1)]
+KING_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+PAWN_DIRECTIONS = [1, -1]
+PAWN_START_ROWS = [1, 6]
+
+# Directions whose steps increase the square number, then those whose steps decrease it.
+POSITIVE_DIAGONALS = [(1, 1), (1, -1)]
+NEGATIVE_DIAGONALS = [(-1, -1), (-1, 1)]
+POSITIVE_LINES = [(1, 0), (0, 1)]
+NEGATIVE_LINES = [(-1, 0), (0, -1)]
+
+
+def _on_board(row, col):
+    return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+
+
+def _offset_table(offsets):
+    table = []
+    for index in range(BOARD_SIZE * BOARD_SIZE):
+        row, col = divmod(index, BOARD_SIZE)
+        targets = 0
+        for vertical, horizontal in offsets:
+            if _on_board(row + vertical, col + horizontal):
+                targets |= 1 << ((row + vertical) * BOARD_SIZE + col + horizontal)
+        table.append(targets)
+    return table
+
+
+def _pawn_tables(direction, start_row):
+    captures = _offset_table([(direction, -1), (direction, 1)])
+    pushes = _offset_table([(direction, 0)])
+    double_pushes = [
+        pushes[index] and (1 << (index + 2 * direction * BOARD_SIZE)) if index // BOARD_SIZE == start_row else 0
+        for index in range(BOARD_SIZE * BOARD_SIZE)
+    ]
+    return captures, pushes, double_pushes
+
+
+KNIGHT_ATTACKS = _offset_table(KNIGHT_OFFSETS)
+KING_ATTACKS = _offset_table(KING_OFFSETS)
+
+_pawn = [_pawn_tables(direction, start_row) for direction, start_row in zip(PAWN_DIRECTIONS, PAWN_START_ROWS)]
+
+# PAWN_ATTACKS[colour][square]: the squares a pawn on that square captures on.
+PAWN_ATTACKS = [_pawn[0][0], _pawn[1][0]]
+# PAWN_PUSHES[colour][square]: the square one step ahead.
+PAWN_PUSHES = [_pawn[0][1], _pawn[1][1]]
+# PAWN_DOUBLE_PUSHES[colour][square]: the square two steps ahead, for pawns on their starting row only.
+PAWN_DOUBLE_PUSHES = [_pawn[0][2], _pawn[1][2]]
+
+del _pawn
+
+
+def _ray_table(vertical, horizontal):
+    table = []
+    for index in range(BOARD_SIZE * BOARD_SIZE):
+        row, col = divmod(index, BOARD_SIZE)
+        ray = 0
+        row, col = row + vertical, col + horizontal
+        while _on_board(row, col):
+            ray |= 1 << (row * BOARD_SIZE + col)
+            row, col = row + vertical, col + horizontal
+        table.append(ray)
+    return table
+
+
+# RAYS[(vertical, horizontal)][square]: every square from (but excluding) the given one to the edge.
+RAYS = {
+    direction: _ray_table(*direction)
+    for direction in POSITIVE_DIAGONALS + NEGATIVE_DIAGONALS + POSITIVE_LINES + NEGATIVE_LINES
+}
+
+_NORTH_EAST, _NORTH_WEST = (RAYS[direction] for direction in POSITIVE_DIAGONALS)
+_SOUTH_WEST, _SOUTH_EAST = (RAYS[direction] for direction in NEGATIVE_DIAGONALS)
+_NORTH, _EAST = (RAYS[direction] for direction in POSITIVE_LINES)
+_SOUTH, _WEST = (RAYS[direction] for direction in NEGATIVE_LINES)
+
+BISHOP_RAYS = [_NORTH_EAST[i] | _NORTH_WEST[i] | _SOUTH_WEST[i] | _SOUTH_EAST[i] for i in range(BOARD_SIZE * BOARD_SIZE)]
+ROOK_RAYS = [_NORTH[i] | _EAST[i] | _SOUTH[i] | _WEST[i] for i in range(BOARD_SIZE * BOARD_SIZE)]
+
+
+def _positive_ray(table, index, occupied):
+    ray = table[index]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= table[(blockers & -blockers).bit_length() - 1]
+    return ray
+
+
+def _negative_ray(table, index, occupied):
+    ray = table[index]
+    blockers = ray & occupied
+    if blockers:
+        ray ^= table[blockers.bit_length() - 1]
+    return ray
+
+
+def bishop_attacks(index, occupied):
+    """
+    The squares a bishop on the given square attacks, given the board's occupancy. Blocking pieces
+    of either colour are included - callers remove their own pieces.
+    """
+    return (_positive_ray(_NORTH_EAST, index, occupied) | _positive_ray(_NORTH_WEST, index, occupied)
+            | _negative_ray(_SOUTH_WEST, index, occupied) | _negative_ray(_SOUTH_EAST, index, occupied))
+
+
+def rook_attacks(index, occupied):
+    """
+    The squares a rook on the given square attacks, given the board's occupancy. Blocking pieces
+    of either colour are included - callers remove their own pieces.
+    """
+    return (_positive_ray(_NORTH, index, occupied) | _positive_ray(_EAST, index, occupied)
+            | _negative_ray(_SOUTH, index, occupied) | _negative_ray(_WEST, index, occupied))
+
+
+def queen_attacks(index, occupied):
+    """
+    The squares a queen on the given square attacks, given the board's occupancy.
+    """
+    return bishop_attacks(index, occupied) | rook_attacks(index, occupied)
+
+
+def _between(start, end):
+    start_row, start_col = divmod(start, BOARD_SIZE)
+    end_row, end_col = divmod(end, BOARD_SIZE)
+    vertical, horizontal = end_row - start_row, end_col - start_col
+    if start == end or not (vertical == 0 or horizontal == 0 or abs(vertical) == abs(horizontal)):
+        return 0
+    vertical = (vertical > 0) - (vertical < 0)
+    horizontal = (horizontal > 0) - (horizontal < 0)
+    squares = 0
+    row, col = start_row + vertical, start_col + horizontal
+    while (row, col) != (end_row, end_col):
+        squares |= 1 << (row * BOARD_SIZE + col)
+        row, col = row + vertical, col + horizontal
+    return squares
+
+
+# BETWEEN[a][b]: the squares strictly between two squares sharing a line or diagonal, otherwise empty.
+BETWEEN = [[_between(start, end) for end in range(BOARD_SIZE * BOARD_SIZE)] for start in range(BOARD_SIZE * BOARD_SIZE)]
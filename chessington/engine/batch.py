@@ -0,0 +1,288 @@
+"""
+Analysing many positions at once with NumPy, for dataset work where looping over positions in
+Python is far too slow.
+
+A batch of N positions is an N x 12 array of unsigned 64-bit bitboards, laid out as
+Board.bitboards is (white pawns to kings, then black), together with an array of the N colours
+to move. Every function works on all N positions at once: shifting bitboards and filling rays
+(Kogge-Stone style) across whole columns of the array, and looping in Python only over the pieces
+of each kind in the busiest position. Board positions can be turned into a batch with
+from_boards().
+
+The bitboards carry neither castling rights nor en passant squares, so those moves are not
+counted. Otherwise the results agree with the single-position code, which is the reference they
+are tested against.
+
+Needs NumPy, which is an optional dependency: install it with `poetry install -E batch`.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from chessington.engine.bitboard import BLACK, PIECE_TYPES, WHITE
+from chessington.engine.evaluation import EG_TABLE, MAX_PHASE, MG_TABLE, PHASE_WEIGHTS
+from chessington.engine.movegen import BISHOP, KING, KNIGHT, PAWN, QUEEN, ROOK
+
+_ALL = np.uint64((1 << 64) - 1)
+_ZERO = np.uint64(0)
+_ONE = np.uint64(1)
+_NOT_A = np.uint64(~0x0101010101010101 & ((1 << 64) - 1))
+_NOT_H = np.uint64(~0x8080808080808080 & ((1 << 64) - 1))
+_NOT_AB = np.uint64(~0x0303030303030303 & ((1 << 64) - 1))
+_NOT_GH = np.uint64(~0xC0C0C0C0C0C0C0C0 & ((1 << 64) - 1))
+_RANK_3 = np.uint64(0xFF << 16)
+_RANK_6 = np.uint64(0xFF << 40)
+
+# (shift, squares a step in that direction can land on): positive shifts move up the board.
+_STRAIGHT = [(8, _ALL), (-8, _ALL), (1, _NOT_A), (-1, _NOT_H)]
+_DIAGONAL = [(9, _NOT_A), (7, _NOT_H), (-7, _NOT_A), (-9, _NOT_H)]
+_KNIGHT_STEPS = [(17, _NOT_A), (15, _NOT_H), (10, _NOT_AB), (6, _NOT_GH),
+                 (-6, _NOT_AB), (-10, _NOT_GH), (-15, _NOT_A), (-17, _NOT_H)]
+_KING_STEPS = _STRAIGHT + _DIAGONAL
+
+# Rows of positions evaluated at a time, to bound the memory taken by unpacked bitboards.
+_EVALUATION_CHUNK = 1 << 14
+
+_MG_WEIGHTS = np.array(MG_TABLE, dtype=np.int64)
+_EG_WEIGHTS = np.array(EG_TABLE, dtype=np.int64)
+_PHASE_WEIGHTS = np.array(PHASE_WEIGHTS * 2, dtype=np.int64)
+
+
+def _shift(bitboards, shift):
+    return bitboards << np.uint64(shift) if shift > 0 else bitboards >> np.uint64(-shift)
+
+
+def _step(bitboards, shift, mask):
+    return _shift(bitboards, shift) & mask
+
+
+def _ray(sources, empty, shift, mask):
+    """
+    The squares attacked along one direction from every source square, up to and including the
+    first occupied square.
+    """
+    empty = empty & mask
+    sources = sources | (empty & _shift(sources, shift))
+    empty = empty & _shift(empty, shift)
+    sources = sources | (empty & _shift(sources, 2 * shift))
+    empty = empty & _shift(empty, 2 * shift)
+    sources = sources | (empty & _shift(sources, 4 * shift))
+    return _step(sources, shift, mask)
+
+
+def _slider_attacks(sources, empty, directions):
+    attacks = np.zeros_like(sources)
+    for shift, mask in directions:
+        attacks |= _ray(sources, empty, shift, mask)
+    return attacks
+
+
+def _leaper_attacks(sources, steps):
+    attacks = np.zeros_like(sources)
+    for shift, mask in steps:
+        attacks |= _step(sources, shift, mask)
+    return attacks
+
+
+def _pawn_attacks(pawns, colour):
+    if colour == WHITE:
+        return _step(pawns, 9, _NOT_A) | _step(pawns, 7, _NOT_H)
+    return _step(pawns, -7, _NOT_A) | _step(pawns, -9, _NOT_H)
+
+
+def _lowest(bitboards):
+    return bitboards & (~bitboards + _ONE)
+
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(bitboards):
+        """
+        The number of squares set in each bitboard of an array.
+        """
+        return np.bitwise_count(bitboards).astype(np.int64)
+else:
+    def popcount(bitboards):
+        """
+        The number of squares set in each bitboard of an array.
+        """
+        bitboards = bitboards - ((bitboards >> _ONE) & np.uint64(0x5555555555555555))
+        pairs = np.uint64(0x3333333333333333)
+        bitboards = (bitboards & pairs) + ((bitboards >> np.uint64(2)) & pairs)
+        bitboards = (bitboards + (bitboards >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+        return ((bitboards * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+
+def from_boards(boards):
+    """
+    The (bitboards, colours to move) arrays of a batch holding the given boards' positions.
+    """
+    bitboards = np.array([board.bitboards for board in boards], dtype=np.uint64).reshape(-1, 2 * PIECE_TYPES)
+    colours = np.array([board.colour_index() for board in boards], dtype=np.uint8)
+    return bitboards, colours
+
+
+def _sides(bitboards, colours):
+    """
+    Splits a batch into (own pieces, enemy pieces) views from each position's side to move: two
+    N x 6 arrays of bitboards.
+    """
+    black = (colours == BLACK)[:, None]
+    white_pieces = bitboards[:, :PIECE_TYPES]
+    black_pieces = bitboards[:, PIECE_TYPES:]
+    return np.where(black, black_pieces, white_pieces), np.where(black, white_pieces, black_pieces)
+
+
+def _pawn_attacks_by(pawns, colours):
+    return np.where(colours == WHITE, _pawn_attacks(pawns, WHITE), _pawn_attacks(pawns, BLACK))
+
+
+def _attacks_by(pieces, occupied, colours):
+    """
+    Every square attacked by a set of pieces - an N x 6 array of one side's bitboards, whose
+    colours are given - with `occupied` blocking the sliders.
+    """
+    empty = ~occupied
+    queens = pieces[:, QUEEN]
+    return (_pawn_attacks_by(pieces[:, PAWN], colours)
+            | _leaper_attacks(pieces[:, KNIGHT], _KNIGHT_STEPS)
+            | _leaper_attacks(pieces[:, KING], _KING_STEPS)
+            | _slider_attacks(pieces[:, BISHOP] | queens, empty, _DIAGONAL)
+            | _slider_attacks(pieces[:, ROOK] | queens, empty, _STRAIGHT))
+
+
+def attack_masks(bitboards):
+    """
+    The squares attacked by each side in each position, as an N x 2 array of bitboards: white's
+    attacks, then black's.
+    """
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    occupied = np.bitwise_or.reduce(bitboards, axis=1)
+    colours = np.zeros(len(bitboards), dtype=np.uint8)
+    return np.stack([_attacks_by(bitboards[:, :PIECE_TYPES], occupied, colours + WHITE),
+                     _attacks_by(bitboards[:, PIECE_TYPES:], occupied, colours + BLACK)], axis=1)
+
+
+def mobility(bitboards, colours):
+    """
+    The number of squares each piece of the side to move can legally move to, summed over its
+    pieces, in each position - what Piece.get_available_moves() would report, added up. A
+    promotion counts once however many pieces it could make.
+    """
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    colours = np.asarray(colours, dtype=np.uint8)
+    own, enemy = _sides(bitboards, colours)
+    own_all = np.bitwise_or.reduce(own, axis=1)
+    enemy_all = np.bitwise_or.reduce(enemy, axis=1)
+    occupied = own_all | enemy_all
+    empty = ~occupied
+    king = own[:, KING]
+    enemy_diagonal = enemy[:, BISHOP] | enemy[:, QUEEN]
+    enemy_straight = enemy[:, ROOK] | enemy[:, QUEEN]
+
+    # Squares the king may not step onto: the enemy's attacks, seeing through the king itself.
+    danger = _attacks_by(enemy, occupied ^ king, 1 - colours)
+    counts = popcount(_leaper_attacks(king, _KING_STEPS) & ~own_all & ~danger)
+
+    # Checks restrict the other pieces to capturing the checker or blocking; pins to their line.
+    checking = ((_leaper_attacks(king, _KNIGHT_STEPS) & enemy[:, KNIGHT])
+                | (_pawn_attacks_by(king, colours) & enemy[:, PAWN]))
+    check_mask = checking.copy()
+    pins = []
+    for directions, snipers in ((_DIAGONAL, enemy_diagonal), (_STRAIGHT, enemy_straight)):
+        for shift, mask in directions:
+            ray = _ray(king, empty, shift, mask)
+            checker = ray & snipers
+            checking |= checker
+            check_mask |= np.where(checker != _ZERO, ray, _ZERO)
+            blocker = ray & own_all
+            beyond = _ray(king, empty | blocker, shift, mask)
+            pinned = np.where((beyond & ~ray & snipers) != _ZERO, blocker, _ZERO)
+            pins.append((pinned, beyond))
+    checks = popcount(checking)
+    target_mask = np.where(checks == 0, _ALL, np.where(checks == 1, check_mask, _ZERO))
+
+    white_to_move = colours == WHITE
+    for piece_type in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN):
+        remaining = own[:, piece_type].copy()
+        while remaining.any():
+            piece = _lowest(remaining)
+            remaining ^= piece
+            if piece_type == PAWN:
+                forward = np.where(white_to_move, _shift(piece, 8), _shift(piece, -8)) & empty
+                double_rank = np.where(white_to_move, _RANK_3, _RANK_6)
+                forward |= np.where(white_to_move, _shift(forward & double_rank, 8),
+                                    _shift(forward & double_rank, -8)) & empty
+                targets = forward | (_pawn_attacks_by(piece, colours) & enemy_all)
+            elif piece_type == KNIGHT:
+                targets = _leaper_attacks(piece, _KNIGHT_STEPS)
+            elif piece_type == BISHOP:
+                targets = _slider_attacks(piece, empty, _DIAGONAL)
+            elif piece_type == ROOK:
+                targets = _slider_attacks(piece, empty, _STRAIGHT)
+            else:
+                targets = _slider_attacks(piece, empty, _DIAGONAL + _STRAIGHT)
+            targets &= ~own_all & target_mask
+            for pinned, line in pins:
+                targets = np.where((piece & pinned) != _ZERO, targets & line, targets)
+            counts += popcount(targets)
+    return counts
+
+
+def evaluate(bitboards, colours):
+    """
+    The static evaluation of each position, in centipawns from the point of view of the side to
+    move - the same as evaluation.evaluate() gives for each position on its own.
+    """
+    bitboards = np.ascontiguousarray(bitboards, dtype='<u8')
+    colours = np.asarray(colours, dtype=np.uint8)
+    scores = np.empty(len(bitboards), dtype=np.int64)
+    for start in range(0, len(bitboards), _EVALUATION_CHUNK):
+        chunk = bitboards[start:start + _EVALUATION_CHUNK]
+        squares = np.unpackbits(chunk.view(np.uint8).reshape(len(chunk), 2 * PIECE_TYPES, 8),
+                                axis=2, bitorder='little')
+        mg_score = np.einsum('ncs,cs->n', squares, _MG_WEIGHTS)
+        eg_score = np.einsum('ncs,cs->n', squares, _EG_WEIGHTS)
+        phase = np.minimum(popcount(chunk) @ _PHASE_WEIGHTS, MAX_PHASE)
+        scores[start:start + len(chunk)] = (mg_score * phase + eg_score * (MAX_PHASE - phase)) // MAX_PHASE
+    return np.where(colours == BLACK, -scores, scores)
+
+
+def main(argv=None):
+    """
+    Command line entry point: times the batch functions against the single-position code on
+    positions from the perft reference set.
+    """
+    from chessington.engine.board import Board
+    from chessington.engine.evaluation import evaluate as evaluate_one
+    from chessington.engine.movegen import generate_legal
+    from chessington.engine.perft import REFERENCE_POSITIONS
+
+    parser = argparse.ArgumentParser(description='Time batch analysis of many positions.')
+    parser.add_argument('--positions', type=int, default=100000, help='batch size (default 100000)')
+    args = parser.parse_args(argv)
+
+    boards = [Board.from_fen(position.fen) for position in REFERENCE_POSITIONS]
+    bitboards, colours = from_boards(boards)
+    repeats = -(-args.positions // len(boards))
+    bitboards, colours = np.tile(bitboards, (repeats, 1)), np.tile(colours, repeats)
+
+    for name, function in (('mobility', mobility), ('evaluate', evaluate)):
+        start = time.perf_counter()
+        function(bitboards, colours)
+        seconds = time.perf_counter() - start
+        print(f'batch {name:<9} {len(bitboards) / seconds:>12.0f} positions/s')
+
+    start = time.perf_counter()
+    for board in boards * 100:
+        generate_legal(board, board.colour_index())
+        evaluate_one(board)
+    seconds = time.perf_counter() - start
+    print(f'one at a time      {len(boards) * 100 / seconds:>12.0f} positions/s (movegen and evaluation)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Timing how fast positions can be loaded into and written out of a Board in bulk, as FEN and packed.
+
+Run `python -m chessington.engine.benchmark --help` for the options.
+"""
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass
+
+from chessington.engine.board import Board
+from chessington.engine.movegen import generate_legal
+from chessington.engine.positions import PackedPositions
+
+
+@dataclass(frozen=True)
+class Throughput:
+    """
+    How many positions an operation got through, and how long it took.
+    """
+    name: str
+    positions: int
+    seconds: float
+
+    @property
+    def positions_per_second(self):
+        return self.positions / self.seconds if self.seconds else float('inf')
+
+
+def sample_positions(count, seed=0):
+    """
+    FENs of `count` positions from random games, for timing.
+    """
+    rng = random.Random(seed)
+    fens = []
+    board = Board.at_starting_position()
+    while len(fens) < count:
+        moves = generate_legal(board, board.colour_index())
+        if not moves or board.halfmove_clock >= 100:
+            board = Board.at_starting_position()
+            continue
+        board.push_encoded(rng.choice(moves))
+        fens.append(board.to_fen())
+    return fens
+
+
+def measure_fen(fens):
+    """
+    Times reading every FEN into a board, and writing every board back out.
+    """
+    start = time.perf_counter()
+    boards = [Board.from_fen(fen) for fen in fens]
+    loading = Throughput('from_fen', len(fens), time.perf_counter() - start)
+    start = time.perf_counter()
+    for board in boards:
+        board.to_fen()
+    writing = Throughput('to_fen', len(fens), time.perf_counter() - start)
+    return [loading, writing]
+
+
+def measure_packing(fens):
+    """
+    Times packing every position, and unpacking them all again from a PackedPositions.
+    """
+    boards = [Board.from_fen(fen) for fen in fens]
+    start = time.perf_counter()
+    positions = PackedPositions.from_boards(boards)
+    packing = Throughput('pack', len(fens), time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in positions:
+        pass
+    unpacking = Throughput('unpack', len(fens), time.perf_counter() - start)
+    return [packing, unpacking]
+
+
+def main(argv=None):
+    """
+    Command line entry point: reports positions per second for bulk board operations.
+    """
+    parser = argparse.ArgumentParser(description='Time loading and writing positions in bulk.')
+    parser.add_argument('--positions', type=int, default=100000, help='positions to time (default 100000)')
+    args = parser.parse_args(argv)
+
+    fens = sample_positions(args.positions)
+    for result in measure_fen(fens) + measure_packing(fens):
+        print(f'{result.name:<10} {result.positions:>9} positions {result.seconds:8.2f}s '
+              f'{result.positions_per_second:>10.0f} positions/s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
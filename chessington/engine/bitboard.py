@@ -0,0 +1,69 @@
+"""
+Helpers for working with bitboards - 64-bit integers holding one bit per square of the board.
+
+Square (row, col) maps to bit number row * 8 + col, so bit 0 is the bottom-left square (a1)
+and bit 63 is the top-right square (h8).
+"""
+
+from chessington.engine.data import BOARD_SIZE
+
+# Colour indices, and the number of piece kinds per colour. Bitboards for black pieces follow the
+# white ones, so the bitboard for a piece lives at piece_type + colour * PIECE_TYPES.
+WHITE = 0
+BLACK = 1
+PIECE_TYPES = 6
+
+ALL_SQUARES = (1 << 64) - 1
+
+FILE_A = 0x0101010101010101
+FILE_H = FILE_A << 7
+RANK_1 = 0xFF
+RANK_8 = RANK_1 << 56
+
+
+def square_index(row, col):
+    """
+    The bit number of the given row and column.
+    """
+    return row * BOARD_SIZE + col
+
+
+def bit(index):
+    """
+    A bitboard with only the given square set.
+    """
+    return 1 << index
+
+
+def lsb(bitboard):
+    """
+    The index of the lowest set square of a non-empty bitboard.
+    """
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+def msb(bitboard):
+    """
+    The index of the highest set square of a non-empty bitboard.
+    """
+    return bitboard.bit_length() - 1
+
+
+def iter_bits(bitboard):
+    """
+    Yields the index of every set square, lowest first.
+    """
+    while bitboard:
+        low = bitboard & -bitboard
+        yield low.bit_length() - 1
+        bitboard ^= low
+
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def popcount(bitboard):
+        """
+        The number of set squares in a bitboard.
+        """
+        return bin(bitboard).count('1')
@@ -1,21 +1,93 @@
 """
-A module providing a representation of a chess board. The rules of chess are not implemented - 
-this is just a "dumb" board that will let you move pieces around as you like.
+A module providing a representation of a chess board. The board can list the legal moves in a
+position, but move_piece is still happy to move pieces around as you like.
 """
 
-from chessington.engine.data import Player, Square
-from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King
+import struct
+
+from chessington.engine.attacks import PAWN_ATTACKS
+from chessington.engine.bitboard import BLACK, BOARD_SIZE, PIECE_TYPES, WHITE, iter_bits
+from chessington.engine.data import Move, PieceType, Player, Square
+from chessington.engine.evaluation import EG_TABLE, MG_TABLE, PHASE_TABLE
+from chessington.engine.movegen import ALL_CASTLING, CASTLE, CASTLING_MASKS, CASTLING_ROOKS, DOUBLE_PUSH, EN_PASSANT
+from chessington.engine.movegen import BLACK_KINGSIDE, BLACK_QUEENSIDE, WHITE_KINGSIDE, WHITE_QUEENSIDE
+from chessington.engine.movegen import KING, PAWN, QUEEN, ROOK, checkers, encode_move, generate_legal
+from chessington.engine.pieces import Pawn, Knight, Bishop, Rook, Queen, King, PIECE_CLASSES
+from chessington.engine.zobrist import BLACK_TO_MOVE_KEY, CASTLING_KEYS, EN_PASSANT_KEYS, PIECE_KEYS
+
+
+STARTING_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+_FEN_SYMBOLS = 'PNBRQKpnbrqk'
+# Everything a piece, by its code, adds to a board: its code, how to make the piece, its weight in the
+# game phase, and per square its bit, Zobrist key and middlegame and endgame scores.
+_PIECE_DATA = [
+    (code, PIECE_CLASSES[code % PIECE_TYPES], Player.BLACK if code >= PIECE_TYPES else Player.WHITE,
+     PHASE_TABLE[code],
+     [(1 << index, PIECE_KEYS[code][index], MG_TABLE[code][index], EG_TABLE[code][index])
+      for index in range(BOARD_SIZE * BOARD_SIZE)])
+    for code in range(2 * PIECE_TYPES)
+]
+_FEN_PIECES = dict(zip(_FEN_SYMBOLS, _PIECE_DATA))
+_FEN_CASTLING = {'K': WHITE_KINGSIDE, 'Q': WHITE_QUEENSIDE, 'k': BLACK_KINGSIDE, 'q': BLACK_QUEENSIDE}
+_FILE_NAMES = 'abcdefgh'
+
+# A packed position: occupied squares, four-bit piece codes, side to move and castling rights, en
+# passant square, halfmove clock and fullmove number, padded to a round size.
+_PACKED = struct.Struct('<Q16sBBHH2x')
+PACKED_SIZE = _PACKED.size
+_MAX_PACKED_PIECES = 32
+_PACKED_BLACK_TO_MOVE = 16
+_PACKED_NO_EN_PASSANT = 255
+
+
+def piece_code(piece):
+    """
+    The index of the bitboard holding pieces of this kind and colour: 0-5 for white, 6-11 for black.
+    """
+    return piece.piece_type + (PIECE_TYPES if piece.player is Player.BLACK else 0)
 
-BOARD_SIZE = 8
 
 class Board:
     """
     A representation of the chess board, and the pieces on it.
+
+    The position is stored twice: as a 64-entry list of piece objects (so that the exact objects
+    placed on the board can be handed back), and as twelve bitboards - one per kind and colour of
+    piece - plus occupancy masks for each side and for the whole board. A map from each piece to
+    its square and a list of pieces per kind and colour are kept alongside, so that finding or
+    listing pieces never needs to scan the board.
+
+    The Zobrist key of the pieces is kept up to date by XOR as they are placed and lifted; the
+    side to move, castling rights and en passant square are folded in when the key is read. The
+    evaluation's middlegame and endgame totals and the game phase are updated alongside. Anything
+    else that needs to follow the pieces, such as a neural network's accumulator, can register as
+    an observer: its piece_placed(index, code) and piece_removed(index, code) methods are called
+    whenever a piece is placed on or lifted from a square, including while moves are taken back.
     """
 
     def __init__(self, player, board_state):
-        self.current_player = Player.WHITE
-        self.board = board_state
+        self.current_player = player
+        self.squares = [None] * (BOARD_SIZE * BOARD_SIZE)
+        self.bitboards = [0] * (2 * PIECE_TYPES)
+        self.occupancy = [0, 0]
+        self.occupied = 0
+        self.locations = {}
+        self.piece_lists = [[] for _ in range(2 * PIECE_TYPES)]
+        self.pieces_key = 0
+        self.mg_score = 0
+        self.eg_score = 0
+        self.phase = 0
+        self.castling_rights = 0
+        self.en_passant = None
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.move_stack = []
+        self.observers = []
+        for row, pieces in enumerate(board_state):
+            for col, piece in enumerate(pieces):
+                if piece is not None:
+                    self.set_piece(Square.at(row, col), piece)
 
     @staticmethod
     def empty():
@@ -23,7 +95,144 @@ class Board:
 
     @staticmethod
     def at_starting_position():
-        return Board(Player.WHITE, Board._create_starting_board())
+        board = Board(Player.WHITE, Board._create_starting_board())
+        board.castling_rights = ALL_CASTLING
+        return board
+
+    @staticmethod
+    def from_fen(fen):
+        """
+        Sets up a board from a position in Forsyth-Edwards Notation, such as
+        'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'. The move clocks may be left off.
+        """
+        fields = fen.split()
+        if len(fields) not in (4, 6) or fields[1] not in ('w', 'b'):
+            raise ValueError(f'Invalid FEN: {fen}')
+        placement, side, castling, en_passant = fields[:4]
+        board = Board(Player.WHITE if side == 'w' else Player.BLACK, ())
+
+        placed = []
+        ranks = placement.split('/')
+        if len(ranks) != BOARD_SIZE:
+            raise ValueError(f'Invalid FEN: {fen}')
+        for rank_from_top, rank in enumerate(ranks):
+            index = (BOARD_SIZE - 1 - rank_from_top) * BOARD_SIZE
+            end = index + BOARD_SIZE
+            for symbol in rank:
+                entry = _FEN_PIECES.get(symbol)
+                if entry is None:
+                    if symbol not in '12345678':
+                        raise ValueError(f'Invalid FEN: {fen}')
+                    index += int(symbol)
+                    continue
+                if index >= end:
+                    raise ValueError(f'Invalid FEN: {fen}')
+                placed.append((index, entry))
+                index += 1
+            if index != end:
+                raise ValueError(f'Invalid FEN: {fen}')
+        board._fill(placed)
+
+        if castling != '-':
+            for symbol in castling:
+                if symbol not in _FEN_CASTLING:
+                    raise ValueError(f'Invalid FEN: {fen}')
+                board.castling_rights |= _FEN_CASTLING[symbol]
+        if en_passant != '-':
+            if len(en_passant) != 2 or en_passant[0] not in _FILE_NAMES or en_passant[1] not in '36':
+                raise ValueError(f'Invalid FEN: {fen}')
+            board.en_passant = (int(en_passant[1]) - 1) * BOARD_SIZE + _FILE_NAMES.index(en_passant[0])
+        if len(fields) == 6:
+            if not (fields[4].isdigit() and fields[5].isdigit()):
+                raise ValueError(f'Invalid FEN: {fen}')
+            board.halfmove_clock = int(fields[4])
+            board.fullmove_number = int(fields[5])
+        return board
+
+    def _fill(self, placed):
+        """
+        Puts pieces on an empty board without observers, given as (index, piece data) pairs with
+        the data from _PIECE_DATA. Rather than placing the pieces one by one, fills in everything
+        the board keeps at once.
+        """
+        squares = self.squares
+        bitboards = self.bitboards
+        locations = self.locations
+        piece_lists = self.piece_lists
+        pieces_key, mg_score, eg_score, phase = 0, 0, 0, 0
+        for index, (code, piece_class, player, weight, square_data) in placed:
+            piece = piece_class(player)
+            squares[index] = piece
+            locations[piece] = index
+            piece_lists[code].append(piece)
+            mask, key, mg, eg = square_data[index]
+            bitboards[code] |= mask
+            pieces_key ^= key
+            mg_score += mg
+            eg_score += eg
+            phase += weight
+        for code, bitboard in enumerate(bitboards):
+            self.occupancy[code >= PIECE_TYPES] |= bitboard
+        self.occupied = self.occupancy[WHITE] | self.occupancy[BLACK]
+        self.pieces_key, self.mg_score, self.eg_score, self.phase = pieces_key, mg_score, eg_score, phase
+
+    def pack(self):
+        """
+        The position in PACKED_SIZE bytes: the occupied squares as a 64-bit mask, then the code of
+        the piece on each occupied square in turn, four bits each, then the side to move, castling
+        rights, en passant square and move clocks. Boards with more than 32 pieces cannot be packed.
+        """
+        occupied = self.occupied
+        squares = self.squares
+        codes = [piece_code(squares[index]) for index in iter_bits(occupied)]
+        if len(codes) > _MAX_PACKED_PIECES:
+            raise ValueError(f'Cannot pack a board with {len(codes)} pieces')
+        codes.extend([0] * (_MAX_PACKED_PIECES - len(codes)))
+        pieces = bytes(low | high << 4 for low, high in zip(codes[::2], codes[1::2]))
+        flags = self.castling_rights | (_PACKED_BLACK_TO_MOVE if self.current_player is Player.BLACK else 0)
+        en_passant = _PACKED_NO_EN_PASSANT if self.en_passant is None else self.en_passant
+        return _PACKED.pack(occupied, pieces, flags, en_passant, self.halfmove_clock, self.fullmove_number)
+
+    @staticmethod
+    def unpack(data):
+        """
+        Sets up a board from the bytes written by pack().
+        """
+        occupied, pieces, flags, en_passant, halfmove_clock, fullmove_number = _PACKED.unpack(data)
+        board = Board(Player.BLACK if flags & _PACKED_BLACK_TO_MOVE else Player.WHITE, ())
+        board._fill([(index, _PIECE_DATA[pieces[number >> 1] >> (number & 1) * 4 & 15])
+                     for number, index in enumerate(iter_bits(occupied))])
+        board.castling_rights = flags & ALL_CASTLING
+        board.en_passant = None if en_passant == _PACKED_NO_EN_PASSANT else en_passant
+        board.halfmove_clock = halfmove_clock
+        board.fullmove_number = fullmove_number
+        return board
+
+    def to_fen(self):
+        """
+        The position in Forsyth-Edwards Notation.
+        """
+        ranks = []
+        squares = self.squares
+        for row in range(BOARD_SIZE - 1, -1, -1):
+            rank = ''
+            empty = 0
+            for piece in squares[row * BOARD_SIZE:(row + 1) * BOARD_SIZE]:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                rank += _FEN_SYMBOLS[piece_code(piece)]
+            ranks.append(rank + str(empty) if empty else rank)
+        castling = ''.join(symbol for symbol, right in _FEN_CASTLING.items() if self.castling_rights & right) or '-'
+        if self.en_passant is None:
+            en_passant = '-'
+        else:
+            en_passant = _FILE_NAMES[self.en_passant % BOARD_SIZE] + str(self.en_passant // BOARD_SIZE + 1)
+        side = 'b' if self.current_player is Player.BLACK else 'w'
+        return f'{"/".join(ranks)} {side} {castling} {en_passant} {self.halfmove_clock} {self.fullmove_number}'
 
     @staticmethod
     def _create_empty_board():
@@ -50,30 +259,276 @@ class Board:
         """
         Places the piece at the given position on the board.
         """
-        self.board[square.row][square.col] = piece
+        index = square.index
+        if self.squares[index] is not None:
+            self._remove(index)
+        if piece is not None:
+            self._put(index, piece)
 
     def get_piece(self, square):
         """
         Retrieves the piece from the given square of the board.
         """
-        return self.board[square.row][square.col]
+        return self.squares[square.index]
 
     def find_piece(self, piece_to_find):
         """
         Searches for the given piece on the board and returns its square.
         """
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                if self.board[row][col] is piece_to_find:
-                    return Square.at(row, col)
-        raise Exception('The supplied piece is not on the board')
+        index = self.locations.get(piece_to_find)
+        if index is None:
+            raise Exception('The supplied piece is not on the board')
+        return Square.from_index(index)
+
+    def get_pieces(self, player, piece_class=None):
+        """
+        Lists the given player's pieces on the board, optionally only those of the given kind.
+        """
+        offset = PIECE_TYPES if player is Player.BLACK else 0
+        if piece_class is not None:
+            return list(self.piece_lists[piece_class.piece_type + offset])
+        pieces = []
+        for code in range(offset, offset + PIECE_TYPES):
+            pieces.extend(self.piece_lists[code])
+        return pieces
+
+    @property
+    def zobrist_key(self):
+        """
+        A 64-bit hash of the position: the pieces, the side to move, castling rights and any en
+        passant capture available.
+        """
+        key = self.pieces_key ^ CASTLING_KEYS[self.castling_rights]
+        colour = WHITE
+        if self.current_player is Player.BLACK:
+            key ^= BLACK_TO_MOVE_KEY
+            colour = BLACK
+        if self.en_passant is not None and \
+                PAWN_ATTACKS[1 - colour][self.en_passant] & self.bitboards[colour * PIECE_TYPES + PAWN]:
+            key ^= EN_PASSANT_KEYS[self.en_passant % BOARD_SIZE]
+        return key
+
+    def pieces_bitboard(self, player, piece_class):
+        """
+        The bitboard of squares holding the given player's pieces of the given kind.
+        """
+        return self.bitboards[piece_class.piece_type + self.colour_index(player) * PIECE_TYPES]
+
+    def player_bitboard(self, player):
+        """
+        The bitboard of squares holding any of the given player's pieces.
+        """
+        return self.occupancy[self.colour_index(player)]
+
+    def _put(self, index, piece):
+        """
+        Places a piece on an empty square, keeping the bitboards in step.
+        """
+        mask = 1 << index
+        code = piece_code(piece)
+        self.squares[index] = piece
+        self.pieces_key ^= PIECE_KEYS[code][index]
+        self.mg_score += MG_TABLE[code][index]
+        self.eg_score += EG_TABLE[code][index]
+        self.phase += PHASE_TABLE[code]
+        self.locations[piece] = index
+        self.piece_lists[code].append(piece)
+        self.bitboards[code] |= mask
+        self.occupancy[code >= PIECE_TYPES] |= mask
+        self.occupied |= mask
+        for observer in self.observers:
+            observer.piece_placed(index, code)
+
+    def _remove(self, index):
+        """
+        Lifts the piece off an occupied square, keeping the bitboards in step, and returns it.
+        """
+        mask = 1 << index
+        piece = self.squares[index]
+        code = piece_code(piece)
+        self.squares[index] = None
+        self.pieces_key ^= PIECE_KEYS[code][index]
+        self.mg_score -= MG_TABLE[code][index]
+        self.eg_score -= EG_TABLE[code][index]
+        self.phase -= PHASE_TABLE[code]
+        if self.locations.get(piece) == index:
+            del self.locations[piece]
+        self.piece_lists[code].remove(piece)
+        self.bitboards[code] ^= mask
+        self.occupancy[code >= PIECE_TYPES] ^= mask
+        self.occupied ^= mask
+        for observer in self.observers:
+            observer.piece_removed(index, code)
+        return piece
 
     def move_piece(self, from_square, to_square):
         """
         Moves the piece from the given starting square to the given destination square.
+
+        Castling, en passant captures and promotion (to a queen) are recognised from the squares
+        given, but otherwise the move is not checked against the rules.
         """
         moving_piece = self.get_piece(from_square)
         if moving_piece is not None and moving_piece.player == self.current_player:
-            self.set_piece(to_square, moving_piece)
-            self.set_piece(from_square, None)
-            self.current_player = self.current_player.opponent()
+            self.push_encoded(self._encode(from_square.index, to_square.index))
+
+    def push(self, move):
+        """
+        Plays the given move for the player whose turn it is. The move is not checked against the
+        rules, but can always be taken back with pop().
+        """
+        self.push_encoded(self._encode(move.from_square.index, move.to_square.index, move.promotion))
+
+    def pop(self):
+        """
+        Takes back the last move played, and returns it.
+        """
+        return self.decode_move(self.pop_encoded())
+
+    def legal_moves(self):
+        """
+        Lists every legal move for the player whose turn it is.
+        """
+        return [self.decode_move(move) for move in generate_legal(self, self.colour_index())]
+
+    def perft(self, depth):
+        """
+        Counts the leaf nodes of the legal move tree to the given depth, for checking and timing
+        move generation against known results.
+        """
+        if depth == 0:
+            return 1
+        return self._perft(depth)
+
+    def perft_divide(self, depth):
+        """
+        Breaks the perft count down by the first move played, to narrow down disagreements with
+        another move generator.
+        """
+        counts = {}
+        for move in generate_legal(self, self.colour_index()):
+            self.push_encoded(move)
+            counts[self.decode_move(move)] = self._perft(depth - 1) if depth > 1 else 1
+            self.pop_encoded()
+        return counts
+
+    def _perft(self, depth):
+        moves = generate_legal(self, self.colour_index())
+        if depth == 1:
+            return len(moves)
+        nodes = 0
+        for move in moves:
+            self.push_encoded(move)
+            nodes += self._perft(depth - 1)
+            self.pop_encoded()
+        return nodes
+
+    def is_in_check(self, player=None):
+        """
+        Whether the given player's king, by default that of the player to move, is in check.
+        """
+        return bool(checkers(self, self.colour_index(player)))
+
+    def colour_index(self, player=None):
+        """
+        The colour index (WHITE or BLACK) of the given player, by default the player to move.
+        """
+        return BLACK if (player or self.current_player) is Player.BLACK else WHITE
+
+    def decode_move(self, move):
+        """
+        The Move for an encoded move, as generate_legal produces them.
+        """
+        from_index = move & 63
+        to_index = move >> 6 & 63
+        promotion = move >> 12 & 7
+        return Move(
+            Square.from_index(from_index),
+            Square.from_index(to_index),
+            PieceType(promotion) if promotion else None,
+        )
+
+    def _encode(self, from_index, to_index, promotion=None):
+        """
+        Encodes a move between two squares, working out from the position whether it is special.
+        """
+        piece = self.squares[from_index]
+        piece_type = piece.piece_type
+        flag = 0
+        if piece_type == PAWN:
+            if abs(to_index - from_index) == 2 * BOARD_SIZE:
+                flag = DOUBLE_PUSH
+            elif to_index == self.en_passant and (to_index - from_index) % BOARD_SIZE:
+                flag = EN_PASSANT
+            elif to_index // BOARD_SIZE in (0, BOARD_SIZE - 1):
+                promotion = promotion or QUEEN
+        elif piece_type == KING and from_index in (4, 60) and to_index in CASTLING_ROOKS \
+                and abs(to_index - from_index) == 2:
+            # Only a castle if the king's own rook is there to come across.
+            rook_from = CASTLING_ROOKS[to_index][0]
+            if self.bitboards[piece_code(piece) - KING + ROOK] >> rook_from & 1:
+                flag = CASTLE
+        return encode_move(from_index, to_index, promotion or 0, flag)
+
+    def push_encoded(self, move):
+        """
+        Plays an encoded move and hands the other player the turn. Everything the move destroys is
+        recorded on the move stack so that pop_encoded() can restore it.
+        """
+        from_index = move & 63
+        to_index = move >> 6 & 63
+        flag = move >> 15
+        piece = self._remove(from_index)
+
+        if flag == EN_PASSANT:
+            captured = self._remove(from_index - from_index % BOARD_SIZE + to_index % BOARD_SIZE)
+        elif self.squares[to_index] is not None:
+            captured = self._remove(to_index)
+        else:
+            captured = None
+        self.move_stack.append((move, piece, captured, self.castling_rights, self.en_passant, self.halfmove_clock))
+
+        promotion = move >> 12 & 7
+        self._put(to_index, PIECE_CLASSES[promotion](piece.player) if promotion else piece)
+
+        if flag == CASTLE:
+            rook_from, rook_to = CASTLING_ROOKS[to_index]
+            self._put(rook_to, self._remove(rook_from))
+
+        self.castling_rights &= CASTLING_MASKS[from_index] & CASTLING_MASKS[to_index]
+        self.en_passant = (from_index + to_index) // 2 if flag == DOUBLE_PUSH else None
+        if captured is None and piece.piece_type != PAWN:
+            self.halfmove_clock += 1
+        else:
+            self.halfmove_clock = 0
+        if piece.player is Player.BLACK:
+            self.fullmove_number += 1
+        self.current_player = self.current_player.opponent()
+
+    def pop_encoded(self):
+        """
+        Takes back the last move played, and returns it encoded.
+        """
+        move, piece, captured, castling_rights, en_passant, halfmove_clock = self.move_stack.pop()
+        from_index = move & 63
+        to_index = move >> 6 & 63
+        flag = move >> 15
+
+        self.current_player = self.current_player.opponent()
+        if piece.player is Player.BLACK:
+            self.fullmove_number -= 1
+        self.castling_rights = castling_rights
+        self.en_passant = en_passant
+        self.halfmove_clock = halfmove_clock
+
+        if flag == CASTLE:
+            rook_from, rook_to = CASTLING_ROOKS[to_index]
+            self._put(rook_from, self._remove(rook_to))
+        self._remove(to_index)
+        self._put(from_index, piece)
+
+        if flag == EN_PASSANT:
+            self._put(from_index - from_index % BOARD_SIZE + to_index % BOARD_SIZE, captured)
+        elif captured is not None:
+            self._put(to_index, captured)
+        return move
@@ -0,0 +1,94 @@
+"""
+Opening books: files of known good moves from known positions, so the search need not spend its
+time on the opening.
+
+A book is a flat binary file of fixed-size entries, each a position's Zobrist key, a move and a
+weight, sorted by key. It is read through mmap and looked up by binary search, so opening a book
+costs nothing however large it is, no entry becomes a Python object until it is asked for, and
+every engine process using the same book shares the same pages of memory.
+
+Moves are stored without their special-move flags (bits 0-14 of the encoded form), as the board
+can work them out again. Weights are how many times the move was played in the games the book
+was built from. Books are built from games by chessington.io.book.
+"""
+
+import mmap
+import random
+import struct
+
+from chessington.engine.movegen import restore_moves
+
+# Little-endian: 64-bit key, 16-bit move, 16-bit weight.
+ENTRY = struct.Struct('<QHH')
+MAX_WEIGHT = 0xFFFF
+
+_KEY = struct.Struct('<Q')
+
+
+class OpeningBook:
+    """
+    A book file opened for lookups. Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            size = file.seek(0, 2)
+            if size % ENTRY.size:
+                raise ValueError(f'{path} is not an opening book: its size is not a whole number of entries')
+            # An empty file cannot be mapped, but is a perfectly good empty book.
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._count = size // ENTRY.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def entries(self, board):
+        """
+        Lists the book's moves in the board's position as (encoded move, weight) pairs, heaviest
+        first, leaving out any that are not legal in the position.
+        """
+        key = board.zobrist_key
+        data = self._data
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if _KEY.unpack_from(data, middle * ENTRY.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        found = []
+        for index in range(low, self._count):
+            entry_key, move, weight = ENTRY.unpack_from(data, index * ENTRY.size)
+            if entry_key != key:
+                break
+            found.append((move, weight))
+        if not found:
+            return []
+
+        found = restore_moves(board, found)
+        found.sort(key=lambda entry: entry[1], reverse=True)
+        return found
+
+    def choose(self, board, rng=random):
+        """
+        Picks a book move for the position at random, in proportion to the weights, and returns it
+        as a Move - or None if the book has nothing to say about the position.
+        """
+        found = self.entries(board)
+        if not found:
+            return None
+        moves, weights = zip(*found)
+        if not any(weights):
+            weights = None
+        return board.decode_move(rng.choices(moves, weights)[0])
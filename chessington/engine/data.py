@@ -2,7 +2,10 @@
 Data classes for easy representation of concepts such as a square on the board or a player.
 """
 from dataclasses import dataclass
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
+from typing import Optional
+
+BOARD_SIZE = 8
 
 class Player(Enum):
     """
@@ -16,17 +19,70 @@ class Player(Enum):
         else: return Player.WHITE
 
 
-@dataclass(frozen=True)
+class PieceType(IntEnum):
+    """
+    The six kinds of chess piece. The values double as indices into per-type tables such as bitboards.
+    """
+    PAWN = 0
+    KNIGHT = 1
+    BISHOP = 2
+    ROOK = 3
+    QUEEN = 4
+    KING = 5
+
+
+@dataclass(frozen=True, eq=False)
 class Square:
+    """
+    A square on the board. The 64 squares on the board exist once each: Square.at and
+    Square.from_index hand out the shared instances, which also carry their 0-63 index
+    (row * 8 + col) so that engine code can work with plain integers.
+    """
     row: int
     col: int
 
+    def __post_init__(self):
+        object.__setattr__(self, 'index', self.row * BOARD_SIZE + self.col)
+
     @classmethod
     def at(cls, row: int, col: int):
         """
         Provides backward compatibility with previous namedtuple implementation.
 
-        Square.at(...) is equivalent to Square(...).
+        Square.at(...) is equivalent to Square(...), but returns the shared instance for squares
+        on the board.
         """
-
+        if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
+            return SQUARES[row * BOARD_SIZE + col]
         return cls(row=row, col=col)
+
+    @staticmethod
+    def from_index(index: int):
+        """
+        The square with the given 0-63 index.
+        """
+        return SQUARES[index]
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Square):
+            return NotImplemented
+        return self.row == other.row and self.col == other.col
+
+    def __hash__(self):
+        return self.index
+
+
+# SQUARES[index]: the shared instance of every square on the board.
+SQUARES = tuple(Square(row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE))
+
+
+@dataclass(frozen=True)
+class Move:
+    """
+    A move from one square to another, naming the piece type chosen when a pawn promotes.
+    """
+    from_square: Square
+    to_square: Square
+    promotion: Optional[PieceType] = None
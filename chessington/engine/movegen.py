@@ -0,0 +1,323 @@
+"""
+Legal move generation over the board's bitboards.
+
+On the hot path a move is a plain int: bits 0-5 hold the origin square, bits 6-11 the destination
+square, bits 12-14 the piece type promoted to (0 when not promoting) and bits 15-16 a flag marking
+the special moves. Board.legal_moves() converts them to Move objects for everyone else.
+
+Legality is decided without trying moves out: the pieces giving check and the pieces pinned to
+their king are worked out once per position, and every pseudo-legal move is masked against them.
+
+Moves written in Standard Algebraic Notation (SAN) are read into the same form by parse_san(), and
+files of moves, such as opening books, store them without their flags, as the board can work the
+flags out again.
+"""
+
+import re
+
+from chessington.engine.attacks import BETWEEN, BISHOP_RAYS, ROOK_RAYS
+from chessington.engine.attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, PAWN_PUSHES, PAWN_DOUBLE_PUSHES
+from chessington.engine.attacks import bishop_attacks, rook_attacks
+from chessington.engine.bitboard import ALL_SQUARES, BLACK, PIECE_TYPES, RANK_1, RANK_8, WHITE
+from chessington.engine.data import PieceType
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = (int(piece_type) for piece_type in PieceType)
+
+NORMAL = 0
+EN_PASSANT = 1
+CASTLE = 2
+DOUBLE_PUSH = 3
+
+PROMOTION_TYPES = [QUEEN, ROOK, BISHOP, KNIGHT]
+
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+ALL_CASTLING = 15
+
+# CASTLING_MASKS[square]: the rights still standing after a move from or to that square.
+CASTLING_MASKS = [ALL_CASTLING] * 64
+CASTLING_MASKS[4] ^= WHITE_KINGSIDE | WHITE_QUEENSIDE
+CASTLING_MASKS[7] ^= WHITE_KINGSIDE
+CASTLING_MASKS[0] ^= WHITE_QUEENSIDE
+CASTLING_MASKS[60] ^= BLACK_KINGSIDE | BLACK_QUEENSIDE
+CASTLING_MASKS[63] ^= BLACK_KINGSIDE
+CASTLING_MASKS[56] ^= BLACK_QUEENSIDE
+
+# CASTLING_ROOKS[king destination]: where the rook starts and ends up.
+CASTLING_ROOKS = {6: (7, 5), 2: (0, 3), 62: (63, 61), 58: (56, 59)}
+
+# Per colour: (right, king from, king to, squares that must be empty, squares the king crosses).
+_CASTLES = [
+    [(WHITE_KINGSIDE, 4, 6, 0x60, (5, 6)), (WHITE_QUEENSIDE, 4, 2, 0x0E, (3, 2))],
+    [(BLACK_KINGSIDE, 60, 62, 0x60 << 56, (61, 62)), (BLACK_QUEENSIDE, 60, 58, 0x0E << 56, (59, 58))],
+]
+
+# Bits 0-14 of a move: all but its flag.
+_MOVE_MASK = 0x7FFF
+
+# Standard Algebraic Notation: piece, origin file and rank if needed, destination, promotion.
+_PIECE_LETTERS = 'PNBRQK'
+_FILES = 'abcdefgh'
+_SAN = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?$')
+
+
+def encode_move(from_index, to_index, promotion=0, flag=NORMAL):
+    """
+    Packs a move into its int form.
+    """
+    return from_index | to_index << 6 | promotion << 12 | flag << 15
+
+
+def strip_move(move):
+    """
+    An encoded move as it is stored: without its special-move flags.
+    """
+    return move & _MOVE_MASK
+
+
+def restore_moves(board, entries):
+    """
+    Turns (stored move, count) pairs for the board's position back into (encoded move, count)
+    pairs. Moves that are not legal in the position, which can only come from two positions
+    sharing a key, are left out.
+    """
+    legal = {move & _MOVE_MASK: move for move in generate_legal(board, board.colour_index())}
+    return [(legal[move], count) for move, count in entries if move in legal]
+
+
+def attackers_to(board, index, occupied):
+    """
+    The bitboard of pieces of either colour attacking the given square, treating exactly the
+    squares in `occupied` as blocking sliding pieces.
+    """
+    bitboards = board.bitboards
+    black = PIECE_TYPES
+    diagonal = bitboards[BISHOP] | bitboards[QUEEN] | bitboards[black + BISHOP] | bitboards[black + QUEEN]
+    straight = bitboards[ROOK] | bitboards[QUEEN] | bitboards[black + ROOK] | bitboards[black + QUEEN]
+    return ((PAWN_ATTACKS[BLACK][index] & bitboards[PAWN])
+            | (PAWN_ATTACKS[WHITE][index] & bitboards[black + PAWN])
+            | (KNIGHT_ATTACKS[index] & (bitboards[KNIGHT] | bitboards[black + KNIGHT]))
+            | (KING_ATTACKS[index] & (bitboards[KING] | bitboards[black + KING]))
+            | (bishop_attacks(index, occupied) & diagonal)
+            | (rook_attacks(index, occupied) & straight))
+
+
+def is_attacked(board, index, by_colour, occupied):
+    """
+    Whether any piece of the given colour attacks the given square.
+    """
+    bitboards = board.bitboards
+    base = by_colour * PIECE_TYPES
+    if KNIGHT_ATTACKS[index] & bitboards[base + KNIGHT]:
+        return True
+    if PAWN_ATTACKS[1 - by_colour][index] & bitboards[base + PAWN]:
+        return True
+    if KING_ATTACKS[index] & bitboards[base + KING]:
+        return True
+    queens = bitboards[base + QUEEN]
+    if bishop_attacks(index, occupied) & (bitboards[base + BISHOP] | queens):
+        return True
+    return bool(rook_attacks(index, occupied) & (bitboards[base + ROOK] | queens))
+
+
+def checkers(board, colour):
+    """
+    The bitboard of enemy pieces giving check to the given colour's king.
+    """
+    kings = board.bitboards[colour * PIECE_TYPES + KING]
+    if not kings:
+        return 0
+    king = kings.bit_length() - 1
+    return attackers_to(board, king, board.occupied) & board.occupancy[1 - colour]
+
+
+def _add_moves(moves, origin, targets):
+    while targets:
+        low = targets & -targets
+        moves.append(origin | (low.bit_length() - 1) << 6)
+        targets ^= low
+
+
+def generate_legal(board, colour, from_mask=ALL_SQUARES, captures_only=False):
+    """
+    Lists the encoded legal moves for the given colour, whether or not it is their turn, optionally
+    only for pieces standing on the squares in `from_mask`, and optionally only captures and
+    promotions. Without a king on the board every pseudo-legal move counts as legal.
+    """
+    moves = []
+    bitboards = board.bitboards
+    base = colour * PIECE_TYPES
+    enemy_base = PIECE_TYPES - base
+    own = board.occupancy[colour]
+    enemy = board.occupancy[1 - colour]
+    occupied = board.occupied
+    kings = bitboards[base + KING]
+
+    target_mask = ALL_SQUARES ^ own
+    pinned = 0
+    pin_masks = {}
+
+    if kings:
+        king = kings.bit_length() - 1
+        in_check = attackers_to(board, king, occupied) & enemy
+
+        if kings & from_mask:
+            without_king = occupied ^ kings
+            targets = KING_ATTACKS[king] & (enemy if captures_only else target_mask)
+            while targets:
+                low = targets & -targets
+                target = low.bit_length() - 1
+                if not is_attacked(board, target, 1 - colour, without_king):
+                    moves.append(king | target << 6)
+                targets ^= low
+
+        if in_check:
+            if in_check & (in_check - 1):
+                return moves
+            target_mask = in_check | BETWEEN[king][in_check.bit_length() - 1]
+        elif kings & from_mask and not captures_only:
+            for right, king_from, king_to, empty, crossed in _CASTLES[colour]:
+                if (board.castling_rights & right and king == king_from and not occupied & empty
+                        and bitboards[base + ROOK] >> CASTLING_ROOKS[king_to][0] & 1
+                        and not any(is_attacked(board, square, 1 - colour, occupied) for square in crossed)):
+                    moves.append(king | king_to << 6 | CASTLE << 15)
+
+        enemy_queens = bitboards[enemy_base + QUEEN]
+        snipers = ((ROOK_RAYS[king] & (bitboards[enemy_base + ROOK] | enemy_queens))
+                   | (BISHOP_RAYS[king] & (bitboards[enemy_base + BISHOP] | enemy_queens)))
+        while snipers:
+            low = snipers & -snipers
+            sniper = low.bit_length() - 1
+            line = BETWEEN[king][sniper]
+            blockers = line & occupied
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pinned |= blockers
+                pin_masks[blockers.bit_length() - 1] = line | low
+            snipers ^= low
+
+    # Pushes never capture, so when only captures are wanted the pushes kept are promotions.
+    push_mask = target_mask & (RANK_1 | RANK_8) if captures_only else target_mask
+    if captures_only:
+        target_mask &= enemy
+    movable = own & from_mask & ~kings
+
+    # Pinned knights can never stay on the line to their king.
+    pieces = bitboards[base + KNIGHT] & movable & ~pinned
+    while pieces:
+        low = pieces & -pieces
+        origin = low.bit_length() - 1
+        _add_moves(moves, origin, KNIGHT_ATTACKS[origin] & target_mask)
+        pieces ^= low
+
+    for piece_type, attacks in ((BISHOP, bishop_attacks), (ROOK, rook_attacks), (QUEEN, None)):
+        pieces = bitboards[base + piece_type] & movable
+        while pieces:
+            low = pieces & -pieces
+            origin = low.bit_length() - 1
+            if attacks is None:
+                targets = bishop_attacks(origin, occupied) | rook_attacks(origin, occupied)
+            else:
+                targets = attacks(origin, occupied)
+            targets &= target_mask
+            if pinned & low:
+                targets &= pin_masks[origin]
+            _add_moves(moves, origin, targets)
+            pieces ^= low
+
+    _add_pawn_moves(moves, board, colour, movable, target_mask, push_mask, pinned, pin_masks)
+    if board.en_passant is not None:
+        _add_en_passant(moves, board, colour, kings, from_mask)
+
+    return moves
+
+
+def _add_pawn_moves(moves, board, colour, movable, target_mask, push_mask, pinned, pin_masks):
+    pushes = PAWN_PUSHES[colour]
+    double_pushes = PAWN_DOUBLE_PUSHES[colour]
+    captures = PAWN_ATTACKS[colour]
+    empty = ALL_SQUARES ^ board.occupied
+    enemy = board.occupancy[1 - colour]
+    last_rank = RANK_1 if colour else RANK_8
+
+    pieces = board.bitboards[colour * PIECE_TYPES + PAWN] & movable
+    while pieces:
+        low = pieces & -pieces
+        origin = low.bit_length() - 1
+        targets = pushes[origin] & empty
+        if targets:
+            targets |= double_pushes[origin] & empty
+        targets = (targets & push_mask) | (captures[origin] & enemy & target_mask)
+        if pinned & low:
+            targets &= pin_masks[origin]
+        double_push = double_pushes[origin]
+        while targets:
+            target_bit = targets & -targets
+            move = origin | (target_bit.bit_length() - 1) << 6
+            if target_bit & last_rank:
+                for promotion in PROMOTION_TYPES:
+                    moves.append(move | promotion << 12)
+            elif target_bit == double_push:
+                moves.append(move | DOUBLE_PUSH << 15)
+            else:
+                moves.append(move)
+            targets ^= target_bit
+        pieces ^= low
+
+
+def _add_en_passant(moves, board, colour, kings, from_mask):
+    target = board.en_passant
+    bitboards = board.bitboards
+    captured = target - 8 if colour == WHITE else target + 8
+    if not bitboards[(PIECE_TYPES - colour * PIECE_TYPES) + PAWN] >> captured & 1:
+        return
+    enemy = board.occupancy[1 - colour] ^ (1 << captured)
+    pieces = PAWN_ATTACKS[1 - colour][target] & bitboards[colour * PIECE_TYPES + PAWN] & from_mask
+    while pieces:
+        low = pieces & -pieces
+        origin = low.bit_length() - 1
+        # The capture empties two squares on the same row at once, so rather than reasoning about
+        # pins, check the king directly against the position after the capture.
+        after = (board.occupied ^ low ^ (1 << captured)) | (1 << target)
+        if not kings or not attackers_to(board, kings.bit_length() - 1, after) & enemy:
+            moves.append(origin | target << 6 | EN_PASSANT << 15)
+        pieces ^= low
+
+
+def parse_san(board, san):
+    """
+    The encoded legal move, for the player to move, written as `san`. Raises ValueError if the
+    text names no legal move, or more than one.
+    """
+    colour = board.colour_index()
+    text = san.rstrip('+#!?')
+
+    if text.replace('0', 'O') in ('O-O', 'O-O-O'):
+        # Kingside the king moves to the g file, queenside to the c file.
+        to_col = 6 if len(text) == 3 else 2
+        moves = generate_legal(board, colour, board.bitboards[colour * PIECE_TYPES + KING])
+        matches = [move for move in moves if move >> 15 == CASTLE and (move >> 6 & 63) % 8 == to_col]
+    else:
+        match = _SAN.match(text)
+        if match is None:
+            raise ValueError(f'Not a move in SAN: {san}')
+        letter, from_file, from_rank, to_name, promotion = match.groups()
+        piece_type = _PIECE_LETTERS.index(letter) if letter else PAWN
+        to_index = (int(to_name[1]) - 1) * 8 + _FILES.index(to_name[0])
+        promotion = _PIECE_LETTERS.index(promotion) if promotion else 0
+        # Only moves of the named kind of piece need generating.
+        moves = generate_legal(board, colour, board.bitboards[colour * PIECE_TYPES + piece_type])
+        matches = [
+            move for move in moves
+            if move >> 6 & 63 == to_index and move >> 12 & 7 == promotion
+            and (from_file is None or (move & 63) % 8 == _FILES.index(from_file))
+            and (from_rank is None or (move & 63) // 8 == int(from_rank) - 1)
+            and not (piece_type == KING and move >> 15 == CASTLE)
+        ]
+
+    if not matches:
+        raise ValueError(f'Illegal move: {san}')
+    if len(matches) > 1:
+        raise ValueError(f'Ambiguous move: {san}')
+    return matches[0]
@@ -0,0 +1,170 @@
+"""
+A neural network evaluation in the style of NNUE ("efficiently updatable neural network"),
+running on the CPU with NumPy.
+
+The network sees the board as 768 inputs, one for each kind and colour of piece on each square,
+from the point of view of each player in turn: for black the board is turned over and the colours
+swapped, so both players are judged by the same weights. The first layer's output for each point
+of view - the accumulator - is simply the sum of the weight rows of the pieces on the board, so
+rather than being recomputed it is updated as pieces are placed and lifted, by observing the
+board. Only the small layers after it are run for each evaluation:
+
+    accumulators (2 x hidden) -> clipped ReLU -> dense (2 * hidden -> 32) -> clipped ReLU
+                              -> dense (32 -> 1) = centipawns for the player to move
+
+Weights are kept in a NumPy .npz file holding the arrays w1, b1, w2, b2, w3 and b3. Needs NumPy,
+which is an optional dependency: install it with `poetry install -E batch`.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from chessington.engine.bitboard import PIECE_TYPES, WHITE
+from chessington.engine.board import Board, piece_code
+from chessington.engine.evaluation import evaluate as evaluate_material
+
+FEATURES = 2 * PIECE_TYPES * 64
+DEFAULT_HIDDEN = 128
+SECOND_HIDDEN = 32
+
+_LAYERS = ['w1', 'b1', 'w2', 'b2', 'w3', 'b3']
+
+
+def _black_feature(feature):
+    """
+    The input number, from black's point of view, of what white sees as the given input.
+    """
+    code, index = divmod(feature, 64)
+    return ((code + PIECE_TYPES) % (2 * PIECE_TYPES)) * 64 + (index ^ 56)
+
+
+class Network:
+    """
+    The weights of an evaluation network.
+    """
+
+    def __init__(self, w1, b1, w2, b2, w3, b3):
+        hidden = b1.shape[0]
+        if w1.shape != (FEATURES, hidden) or w2.shape != (2 * hidden, b2.shape[0]) \
+                or w3.shape != (b2.shape[0], 1) or b3.shape != (1,):
+            raise ValueError('The network weights do not fit together')
+        self.w1, self.b1, self.w2, self.b2, self.w3, self.b3 = (
+            np.asarray(layer, dtype=np.float32) for layer in (w1, b1, w2, b2, w3, b3))
+
+    @property
+    def hidden(self):
+        return self.b1.shape[0]
+
+    @staticmethod
+    def load(path):
+        """
+        Reads a network from a .npz file.
+        """
+        with np.load(path) as data:
+            return Network(*(data[name] for name in _LAYERS))
+
+    def save(self, path):
+        np.savez(path, **{name: getattr(self, name) for name in _LAYERS})
+
+    @staticmethod
+    def random(hidden=DEFAULT_HIDDEN, seed=0):
+        """
+        A network of untrained random weights, for trying the machinery out. Its scores mean
+        nothing - not even that material matters, so quiescence search finds little to cut.
+        """
+        rng = np.random.default_rng(seed)
+        return Network(
+            rng.normal(0, 0.05, (FEATURES, hidden)), np.full(hidden, 0.5),
+            rng.normal(0, 1 / np.sqrt(2 * hidden), (2 * hidden, SECOND_HIDDEN)), np.zeros(SECOND_HIDDEN),
+            rng.normal(0, 100, (SECOND_HIDDEN, 1)), np.zeros(1),
+        )
+
+
+class NnueEvaluator:
+    """
+    Evaluates a board's positions with a network, keeping the accumulators in step with the board
+    for as long as it is attached. Pass its evaluate method to a Searcher.
+    """
+
+    def __init__(self, network, board):
+        self.network = network
+        self.board = board
+        self.accumulators = np.empty((2, network.hidden), dtype=np.float32)
+        # _rows[code * 64 + index]: the first layer weights of the piece for each point of view.
+        black_view = network.w1[[_black_feature(feature) for feature in range(FEATURES)]]
+        self._rows = np.stack([network.w1, black_view], axis=1)
+        self.refresh()
+        board.observers.append(self)
+
+    def detach(self):
+        """
+        Stops following the board.
+        """
+        self.board.observers.remove(self)
+
+    def refresh(self):
+        """
+        Recomputes the accumulators from every piece on the board.
+        """
+        self.accumulators[:] = self.network.b1
+        for index, piece in enumerate(self.board.squares):
+            if piece is not None:
+                self.piece_placed(index, piece_code(piece))
+
+    def piece_placed(self, index, code):
+        self.accumulators += self._rows[code * 64 + index]
+
+    def piece_removed(self, index, code):
+        self.accumulators -= self._rows[code * 64 + index]
+
+    def evaluate(self, board=None):
+        """
+        The position's score in centipawns, from the point of view of the player to move. The
+        board argument is only there to fit the Searcher; it must be the board followed.
+        """
+        network = self.network
+        accumulators = self.accumulators if self.board.colour_index() == WHITE else self.accumulators[::-1]
+        inputs = np.clip(accumulators.reshape(-1), 0, 1)
+        hidden = np.clip(inputs @ network.w2 + network.b2, 0, 1)
+        return int(hidden @ network.w3[:, 0] + network.b3[0])
+
+
+def main(argv=None):
+    """
+    Command line entry point: compares evaluations per second of a network against the material
+    and piece-square evaluation, on random moves played and taken back from the reference positions.
+    """
+    from chessington.engine.movegen import generate_legal
+    from chessington.engine.perft import REFERENCE_POSITIONS
+
+    parser = argparse.ArgumentParser(description='Time the neural network evaluation.')
+    parser.add_argument('--weights', help='a .npz file of network weights (default: random weights)')
+    parser.add_argument('--evaluations', type=int, default=20000, help='evaluations to time (default 20000)')
+    args = parser.parse_args(argv)
+
+    network = Network.load(args.weights) if args.weights else Network.random()
+    rng = random.Random(0)
+    boards = [Board.from_fen(position.fen) for position in REFERENCE_POSITIONS]
+    moves = [generate_legal(board, board.colour_index()) for board in boards]
+    work = [(board, rng.choice(board_moves)) for board, board_moves in zip(boards, moves)
+            for _ in range(args.evaluations // len(boards))]
+
+    for name in ('material', 'nnue'):
+        evaluators = {id(board): NnueEvaluator(network, board).evaluate if name == 'nnue' else evaluate_material
+                      for board in boards}
+        start = time.perf_counter()
+        for board, move in work:
+            board.push_encoded(move)
+            evaluators[id(board)](board)
+            board.pop_encoded()
+        seconds = time.perf_counter() - start
+        print(f'{name:<9} {len(work) / seconds:>10.0f} evaluations/s (each after a move played and taken back)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
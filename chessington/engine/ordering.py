@@ -0,0 +1,121 @@
+"""
+Move ordering for the search. Alpha-beta prunes the most when the best move is tried first, so
+moves are sorted by how likely they are to cause a cutoff:
+
+1. the move the transposition table remembers from an earlier search of the position,
+2. captures, most valuable victim first and, between equal victims, least valuable attacker first
+   (MVV-LVA), then promotions,
+3. killer moves - quiet moves that caused a cutoff at the same ply elsewhere in the tree,
+4. all other quiet moves, by their history score: how often and how deep they caused cutoffs.
+"""
+
+from dataclasses import dataclass
+
+from chessington.engine.movegen import EN_PASSANT, PAWN
+
+MAX_PLY = 128
+KILLERS_PER_PLY = 2
+
+TABLE_MOVE_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 28
+PROMOTION_SCORE = CAPTURE_SCORE - 1000
+KILLER_SCORE = 1 << 26
+# History scores are halved whenever they reach this, so they stay below the killers.
+HISTORY_LIMIT = KILLER_SCORE - 1
+
+# Indexed by piece type; the king never appears as a victim.
+ORDERING_VALUES = [1, 3, 3, 5, 9, 10]
+
+# MVV_LVA[victim type][attacker type]
+MVV_LVA = [[victim * 16 - attacker for attacker in ORDERING_VALUES] for victim in ORDERING_VALUES]
+
+
+@dataclass
+class OrderingStats:
+    """
+    How often the first move tried at a node was the one that caused its beta cutoff. The closer
+    this is to one, the closer the search comes to the minimal alpha-beta tree.
+    """
+    cutoffs: int = 0
+    first_move_cutoffs: int = 0
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+
+class MoveOrderer:
+    """
+    Sorts encoded moves for the search, learning killer moves and history scores from the
+    cutoffs it is told about.
+    """
+
+    def __init__(self):
+        self.killers = [[0] * KILLERS_PER_PLY for _ in range(MAX_PLY)]
+        self.history = [0] * (64 * 64)
+        self.stats = OrderingStats()
+
+    def new_search(self):
+        """
+        Forgets the killers and statistics of the previous search, and halves the history scores
+        so recent experience counts for more.
+        """
+        self.killers = [[0] * KILLERS_PER_PLY for _ in range(MAX_PLY)]
+        self.history = [score // 2 for score in self.history]
+        self.stats = OrderingStats()
+
+    def order(self, board, moves, ply, table_move=0):
+        """
+        Returns the given moves, best first.
+        """
+        squares = board.squares
+        killers = self.killers[ply]
+        history = self.history
+        scored = []
+        for move in moves:
+            if move == table_move:
+                score = TABLE_MOVE_SCORE
+            else:
+                victim = squares[move >> 6 & 63]
+                if victim is not None:
+                    score = CAPTURE_SCORE + MVV_LVA[victim.piece_type][squares[move & 63].piece_type]
+                elif move >> 15 == EN_PASSANT:
+                    score = CAPTURE_SCORE + MVV_LVA[PAWN][PAWN]
+                elif move >> 12 & 7:
+                    score = PROMOTION_SCORE + (move >> 12 & 7)
+                elif move == killers[0]:
+                    score = KILLER_SCORE + 1
+                elif move == killers[1]:
+                    score = KILLER_SCORE
+                else:
+                    score = history[move & 4095]
+            scored.append((score, move))
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def is_quiet(self, board, move):
+        """
+        Whether a move neither captures nor promotes.
+        """
+        return board.squares[move >> 6 & 63] is None and move >> 15 != EN_PASSANT and not move >> 12 & 7
+
+    def record_cutoff(self, move, quiet, depth, ply, move_number):
+        """
+        Learns from a move that caused a beta cutoff: `move_number` is how many moves were tried
+        before it at the node.
+        """
+        stats = self.stats
+        stats.cutoffs += 1
+        if move_number == 0:
+            stats.first_move_cutoffs += 1
+        if not quiet:
+            return
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        history = self.history
+        index = move & 4095
+        history[index] += depth * depth
+        if history[index] >= HISTORY_LIMIT:
+            self.history = [score // 2 for score in history]
@@ -0,0 +1,157 @@
+"""
+Searching on several cores at once. CPython runs one thread of Python at a time, so the work is
+spread over a pool of processes instead, by splitting the root: each legal move in the position is
+searched to the remaining depth by whichever worker is free, and the best reply wins.
+
+The most promising root move is searched first, on its own, to give a score to beat. The other
+moves are then searched side by side with a null window around that score, which only proves
+whether a move is better; the few that are get searched again with a full window. Each worker
+keeps its own transposition table for its whole life, so later root moves can reuse what earlier
+ones found.
+
+Run `python -m chessington.engine.parallel --help` to compare against a single core.
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from chessington.engine.board import Board
+from chessington.engine.movegen import checkers, generate_legal
+from chessington.engine.ordering import MoveOrderer
+from chessington.engine.search import DRAW_SCORE, MATE_SCORE, SearchResult, Searcher
+from chessington.engine.tt import TranspositionTable
+
+DEFAULT_TABLE_MB = 16
+
+_worker_table = None
+
+
+def _start_worker(table_mb):
+    global _worker_table
+    _worker_table = TranspositionTable(table_mb)
+
+
+def _search_root_move(board, move, depth, alpha=None):
+    """
+    Runs in a worker: searches one root move as the single-core search would. Returns the score
+    from the root player's point of view, the expected line after the move, and the nodes
+    searched. Given `alpha`, the search only establishes whether the move scores above it.
+    """
+    searcher = Searcher(board, _worker_table)
+    if alpha is None:
+        result = searcher.search_move(move, depth)
+    else:
+        result = searcher.search_move(move, depth, alpha, alpha + 1)
+    return result.score, result.principal_variation[1:], result.nodes
+
+
+class ParallelSearcher:
+    """
+    A pool of search processes. Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, workers=None, table_mb=DEFAULT_TABLE_MB):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_start_worker, initargs=(table_mb,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def search(self, board, depth):
+        """
+        Searches the board's position to a fixed depth, splitting the root moves between the
+        workers. The board itself is left untouched. Raises ValueError if `depth` is less than 1.
+        """
+        if depth < 1:
+            raise ValueError(f'Cannot search to depth {depth}')
+        start = time.perf_counter()
+        colour = board.colour_index()
+        moves = generate_legal(board, colour)
+        if not moves:
+            score = -MATE_SCORE if checkers(board, colour) else DRAW_SCORE
+            return SearchResult(None, score, 0, seconds=time.perf_counter() - start)
+
+        moves = MoveOrderer().order(board, moves, 0)
+        best_move = moves[0]
+        best_score, best_line, nodes = self._pool.submit(_search_root_move, board, best_move, depth).result()
+
+        scouts = [(move, self._pool.submit(_search_root_move, board, move, depth, best_score)) for move in moves[1:]]
+        better = []
+        for move, future in scouts:
+            score, _, move_nodes = future.result()
+            nodes += move_nodes
+            if score > best_score:
+                better.append(move)
+
+        researches = [(move, self._pool.submit(_search_root_move, board, move, depth)) for move in better]
+        for move, future in researches:
+            score, line, move_nodes = future.result()
+            nodes += move_nodes
+            if score > best_score:
+                best_move, best_score, best_line = move, score, line
+
+        best = board.decode_move(best_move)
+        return SearchResult(best, best_score, depth, [best] + best_line, nodes, time.perf_counter() - start)
+
+
+@dataclass(frozen=True)
+class SpeedupReport:
+    """
+    Timings of the same fixed-depth search on one core and on a pool of workers.
+    """
+    depth: int
+    workers: int
+    single_seconds: float
+    parallel_seconds: float
+    single_nodes: int
+    parallel_nodes: int
+
+    @property
+    def speedup(self):
+        return self.single_seconds / self.parallel_seconds if self.parallel_seconds else 0.0
+
+
+def measure_speedup(board, depth, workers=None, table_mb=DEFAULT_TABLE_MB):
+    """
+    Searches the board to the given depth on one core and then on a pool of workers, reporting
+    both. Starting the pool is not counted against the parallel search.
+    """
+    single = Searcher(board, TranspositionTable(table_mb)).search(max_depth=depth)
+    with ParallelSearcher(workers, table_mb) as searcher:
+        searcher.search(board, 1)  # warm the workers up
+        parallel = searcher.search(board, depth)
+        workers = searcher.workers
+    return SpeedupReport(depth, workers, single.seconds, parallel.seconds, single.nodes, parallel.nodes)
+
+
+def main(argv=None):
+    """
+    Command line entry point: reports parallel speedup on the reference positions.
+    """
+    from chessington.engine.perft import REFERENCE_POSITIONS
+
+    parser = argparse.ArgumentParser(description='Compare parallel and single-core search.')
+    parser.add_argument('--depth', type=int, default=4, help='depth to search to (default 4)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per core)')
+    args = parser.parse_args(argv)
+
+    for position in REFERENCE_POSITIONS:
+        report = measure_speedup(Board.from_fen(position.fen), args.depth, args.workers)
+        print(f'{position.name:<10} depth {report.depth}: 1 core {report.single_seconds:7.2f}s '
+              f'({report.single_nodes} nodes), {report.workers} workers {report.parallel_seconds:7.2f}s '
+              f'({report.parallel_nodes} nodes), speedup {report.speedup:.2f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
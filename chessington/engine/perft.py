@@ -0,0 +1,119 @@
+"""
+Perft: counting the positions reachable in a fixed number of moves, to prove move generation
+correct against published results and to measure how fast it runs.
+
+Run `poetry run perft --help` for the command line options.
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from typing import List
+
+from chessington.engine.board import Board
+
+
+@dataclass(frozen=True)
+class ReferencePosition:
+    """
+    A position with its known perft node counts, starting at depth 1.
+    """
+    name: str
+    fen: str
+    node_counts: List[int]
+
+
+# The standard test positions from the Chess Programming Wiki.
+REFERENCE_POSITIONS = [
+    ReferencePosition('start', 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+                      [20, 400, 8902, 197281, 4865609, 119060324]),
+    ReferencePosition('kiwipete', 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+                      [48, 2039, 97862, 4085603, 193690690]),
+    ReferencePosition('position3', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+                      [14, 191, 2812, 43238, 674624, 11030083]),
+    ReferencePosition('position4', 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+                      [6, 264, 9467, 422333, 15833292]),
+    ReferencePosition('position5', 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+                      [44, 1486, 62379, 2103487, 89941194]),
+    ReferencePosition('position6', 'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+                      [46, 2079, 89890, 3894594, 164075551]),
+]
+
+
+@dataclass(frozen=True)
+class PerftResult:
+    """
+    The outcome of timing a perft run.
+    """
+    depth: int
+    nodes: int
+    seconds: float
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.seconds if self.seconds else float('inf')
+
+
+def run_perft(board, depth):
+    """
+    Times a perft run on the given board.
+    """
+    start = time.perf_counter()
+    nodes = board.perft(depth)
+    return PerftResult(depth, nodes, time.perf_counter() - start)
+
+
+def _move_name(move):
+    name = ''.join('abcdefgh'[square.col] + str(square.row + 1) for square in (move.from_square, move.to_square))
+    return name + ('nbrq'[move.promotion - 1] if move.promotion else '')
+
+
+def main(argv=None):
+    """
+    Command line entry point: runs perft on the reference positions (or a given FEN) and reports
+    node counts, correctness and speed.
+    """
+    parser = argparse.ArgumentParser(description='Count and time move generation.')
+    parser.add_argument('--depth', type=int, default=3, help='depth to search to (default 3)')
+    parser.add_argument('--position', choices=[position.name for position in REFERENCE_POSITIONS],
+                        help='only run this reference position')
+    parser.add_argument('--fen', help='run a custom position instead of the reference positions')
+    parser.add_argument('--divide', action='store_true', help='break the count down by first move')
+    args = parser.parse_args(argv)
+
+    if args.fen:
+        positions = [ReferencePosition('custom', args.fen, [])]
+    else:
+        positions = [position for position in REFERENCE_POSITIONS if args.position in (None, position.name)]
+
+    failures = 0
+    total_nodes, total_seconds = 0, 0.0
+    for position in positions:
+        board = Board.from_fen(position.fen)
+        if args.divide:
+            for move, nodes in sorted(board.perft_divide(args.depth).items(), key=lambda item: _move_name(item[0])):
+                print(f'{_move_name(move)}: {nodes}')
+        result = run_perft(board, args.depth)
+        total_nodes += result.nodes
+        total_seconds += result.seconds
+
+        expected = position.node_counts[args.depth - 1] if 0 < args.depth <= len(position.node_counts) else None
+        if expected is None:
+            verdict = ''
+        elif expected == result.nodes:
+            verdict = 'ok'
+        else:
+            verdict = f'FAILED (expected {expected})'
+            failures += 1
+        print(f'{position.name:<10} depth {args.depth}: {result.nodes:>12} nodes '
+              f'{result.seconds:8.2f}s {result.nodes_per_second:>10.0f} nps  {verdict}')
+
+    if len(positions) > 1 and total_seconds:
+        print(f'{"total":<10} depth {args.depth}: {total_nodes:>12} nodes '
+              f'{total_seconds:8.2f}s {total_nodes / total_seconds:>10.0f} nps')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
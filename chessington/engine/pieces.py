@@ -2,27 +2,35 @@
 Definitions of each of the different chess pieces.
 """
 
-from abc import ABC, abstractmethod
+from chessington.engine.bitboard import PIECE_TYPES
+from chessington.engine.data import PieceType, Square
+from chessington.engine.movegen import generate_legal, is_attacked
 
-from chessington.engine.data import Player, Square
-
-def inBounds(num):
-    return num >= 0 and num <= 7
-
-class Piece(ABC):
+class Piece:
     """
-    An abstract base class from which all pieces inherit.
+    The base class from which all pieces inherit. Only its subclasses, which each set a piece_type,
+    can be created.
     """
 
+    piece_type = None
+
     def __init__(self, player):
+        if self.piece_type is None:
+            raise TypeError(f'{type(self).__name__} has no piece_type: create one of its subclasses')
         self.player = player
 
-    @abstractmethod
     def get_available_moves(self, board):
         """
         Get all squares that the piece is allowed to move to.
         """
-        pass
+        index = board.find_piece(self).index
+        colour = board.colour_index(self.player)
+        targets = []
+        for move in generate_legal(board, colour, 1 << index):
+            target = move >> 6 & 63
+            if target not in targets:
+                targets.append(target)
+        return [Square.from_index(target) for target in targets]
 
     def move_to(self, board, new_square):
         """
@@ -36,193 +44,51 @@ class Pawn(Piece):
     """
     A class representing a chess pawn.
     """
-
-    def get_available_moves(self, board):
-        moves = []
-        multiplier = -1
-        start_row = 6
-
-        current_square = board.find_piece(self)
-        if self.player == Player.WHITE:
-            multiplier = 1
-            start_row = 1
-
-        #vertical moves
-        if inBounds(current_square.row+(1*multiplier)):
-            if board.get_piece(Square.at(current_square.row+(1*multiplier),current_square.col)) == None:
-                moves.append(Square.at(current_square.row+(1*multiplier),current_square.col))
-                if current_square.row == start_row and \
-                board.get_piece(Square.at(current_square.row+(2*multiplier),current_square.col)) == None:
-                    moves.append(Square.at(row=current_square.row+(2*multiplier),col=current_square.col))
-
-        #diagonal moves
-        if inBounds(current_square.row+(1*multiplier)):
-            for horizontal in [-1,1]:
-                if inBounds(current_square.col+(1*horizontal)):
-                    piece = board.get_piece(Square.at(current_square.row+(1*multiplier),current_square.col+(1*horizontal)))
-                    if piece != None:
-                        if piece.player != self.player:
-                            moves.append(Square.at(current_square.row+(1*multiplier),current_square.col+(1*horizontal)))
-
-        return moves
+    piece_type = PieceType.PAWN
 
 
 class Knight(Piece):
     """
     A class representing a chess knight.
     """
-
-    def get_available_moves(self, board):
-        moves = []
-        list = [(-2,-1),(-1,-2),(1,-2),(2,-1),(2,1),(1,2),(-1,2),(-2,1)]
-        current_square = board.find_piece(self)
-        for vertical,horizontal in list:
-            if inBounds(current_square.row+vertical) and inBounds(current_square.col+horizontal):
-                square = Square.at(current_square.row+vertical,current_square.col+horizontal)
-                piece = board.get_piece(square)
-                if piece == None:
-                    moves.append(square)
-                elif piece.player != self.player:
-                    moves.append(square)
-
-        return moves
+    piece_type = PieceType.KNIGHT
 
 
 class Bishop(Piece):
     """
     A class representing a chess bishop.
     """
-
-    def get_available_moves(self, board):
-        moves = []
-        current_square = board.find_piece(self)
-        for vertical,horizontal in [(1,1),(1,-1),(-1,1),(-1,-1)]:
-            for i in range(1,8):
-                if inBounds(current_square.row+(vertical*i)) and inBounds(current_square.col+(horizontal*i)):
-                     square = Square.at(current_square.row+(vertical*i),current_square.col+(horizontal*i))
-                     piece = board.get_piece(square)
-                     if piece == None:
-                         moves.append(square)
-                     elif piece.player != self.player:
-                         moves.append(square)
-                         break
-                     else:
-                         break
-
-        return moves
+    piece_type = PieceType.BISHOP
 
 
 class Rook(Piece):
     """
     A class representing a chess rook.
     """
-
-    def get_available_moves(self, board):
-        moves = []
-
-        current_square = board.find_piece(self)
-
-        for direction in [1,-1]:
-            if direction == 1: max = 8
-            else: max = -1
-
-            for vertical in range(current_square.row+direction,max,direction):
-                square = Square.at(vertical,current_square.col)
-                piece = board.get_piece(square)
-                if piece == None:
-                    moves.append(square)
-                elif piece.player != self.player:
-                    moves.append(square)
-                    break
-                else:
-                    break
-            for horizontal in range(current_square.col+direction,max,direction):
-                square = Square.at(current_square.row,horizontal)
-                piece = board.get_piece(square)
-                if piece == None:
-                    moves.append(square)
-                elif piece.player != self.player:
-                    moves.append(square)
-                    break
-                else:
-                    break
-
-        return moves
+    piece_type = PieceType.ROOK
 
 
 class Queen(Piece):
     """
     A class representing a chess queen.
     """
-
-    def get_available_moves(self, board):
-        moves = []
-
-        current_square = board.find_piece(self)
-
-        for vertical,horizontal in [(1,1),(1,-1),(-1,1),(-1,-1)]:
-            for i in range(1,8):
-                if inBounds(current_square.row+(vertical*i)) and inBounds(current_square.col+(horizontal*i)):
-                     square = Square.at(current_square.row+(vertical*i),current_square.col+(horizontal*i))
-                     piece = board.get_piece(square)
-                     if piece == None:
-                         moves.append(square)
-                     elif piece.player != self.player:
-                         moves.append(square)
-                         break
-                     else:
-                         break
-
-        for direction in [1,-1]:
-            if direction == 1: max = 8
-            else: max = -1
-
-            for vertical in range(current_square.row+direction,max,direction):
-                square = Square.at(vertical,current_square.col)
-                piece = board.get_piece(square)
-                if piece == None:
-                    moves.append(square)
-                elif piece.player != self.player:
-                    moves.append(square)
-                    break
-                else:
-                    break
-            for horizontal in range(current_square.col+direction,max,direction):
-                square = Square.at(current_square.row,horizontal)
-                piece = board.get_piece(square)
-                if piece == None:
-                    moves.append(square)
-                elif piece.player != self.player:
-                    moves.append(square)
-                    break
-                else:
-                    break
-
-        return moves
+    piece_type = PieceType.QUEEN
 
 
 class King(Piece):
     """
     A class representing a chess king.
     """
-    def in_check(self,board,square):
-        return False
-
-    def get_available_moves(self, board):
-        moves = []
-        current_square = board.find_piece(self)
-        for vertical in [-1,0,1]:
-            for horizontal in [-1,0,1]:
-                square = Square.at(current_square.row+vertical,current_square.col+horizontal)
-                if square != current_square and inBounds(square.row) and inBounds(square.col):
-                    piece = board.get_piece(square)
-                    if not self.in_check(board,square):
-                        if piece is None:
-                            moves.append(square)
-                        elif piece.player != self.player:
-                            moves.append(square)
-
+    piece_type = PieceType.KING
 
+    def in_check(self, board, square):
+        """
+        Whether this king would be in check standing on the given square.
+        """
+        colour = board.colour_index(self.player)
+        kings = board.bitboards[colour * PIECE_TYPES + self.piece_type]
+        return is_attacked(board, square.index, 1 - colour, board.occupied & ~kings)
 
 
-        return moves
+# The piece classes, indexed by their piece type.
+PIECE_CLASSES = [Pawn, Knight, Bishop, Rook, Queen, King]
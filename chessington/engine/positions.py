@@ -0,0 +1,89 @@
+"""
+Holding large numbers of positions in memory, packed.
+
+A Board keeps a piece object per piece and a list slot per square, several kilobytes in all; packed
+with Board.pack() the same position takes PACKED_SIZE (32) bytes. PackedPositions keeps packed
+positions end to end in one bytearray, so a million of them take 32 MB and any one can be read
+back without touching the rest.
+"""
+
+from chessington.engine.board import PACKED_SIZE, Board
+
+
+class PackedPositions:
+    """
+    A list of positions, stored packed. Indexing unpacks a new Board; packed() hands back the bytes.
+    """
+
+    def __init__(self, data=b''):
+        if len(data) % PACKED_SIZE:
+            raise ValueError(f'Packed positions take a multiple of {PACKED_SIZE} bytes, not {len(data)}')
+        self._data = bytearray(data)
+
+    @staticmethod
+    def from_boards(boards):
+        positions = PackedPositions()
+        positions.extend(boards)
+        return positions
+
+    @staticmethod
+    def load(path):
+        """
+        Reads positions written by save().
+        """
+        with open(path, 'rb') as file:
+            return PackedPositions(file.read())
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(self._data)
+
+    def __len__(self):
+        return len(self._data) // PACKED_SIZE
+
+    def __getitem__(self, index):
+        return Board.unpack(self.packed(index))
+
+    def __iter__(self):
+        data = self._data
+        for start in range(0, len(data), PACKED_SIZE):
+            yield Board.unpack(data[start:start + PACKED_SIZE])
+
+    @property
+    def nbytes(self):
+        return len(self._data)
+
+    def packed(self, index):
+        """
+        The packed bytes of the position at the given index, which may count from the end.
+        """
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError('position index out of range')
+        start = index * PACKED_SIZE
+        return bytes(self._data[start:start + PACKED_SIZE])
+
+    def append(self, board):
+        self._data += board.pack()
+
+    def extend(self, boards):
+        self._data += b''.join(board.pack() for board in boards)
+
+    def to_numpy(self):
+        """
+        The positions as a read-only NumPy structured array over a copy of the bytes, so that
+        positions can still be added afterwards, with fields occupied, pieces, flags, en_passant,
+        halfmove_clock and fullmove_number. Needs NumPy, which is an optional dependency: install it
+        with `poetry install -E batch`.
+        """
+        import numpy as np
+
+        dtype = np.dtype({
+            'names': ['occupied', 'pieces', 'flags', 'en_passant', 'halfmove_clock', 'fullmove_number'],
+            'formats': ['<u8', 'V16', 'u1', 'u1', '<u2', '<u2'],
+            'offsets': [0, 8, 24, 25, 26, 28],
+            'itemsize': PACKED_SIZE,
+        })
+        return np.frombuffer(bytes(self._data), dtype=dtype)
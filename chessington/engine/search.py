@@ -0,0 +1,346 @@
+"""
+Choosing a move: negamax alpha-beta search with iterative deepening, under an optional time limit.
+
+The search works on the board in place with push/pop, so it never copies the board. Results are
+cached in a transposition table shared between iterations, and moves are tried in the order
+chosen by a MoveOrderer, starting with the best move the table remembers. When a deadline is
+given, the search reads the clock every few dozen nodes and abandons the unfinished iteration once
+the deadline passes, answering with the last iteration it completed - so the deadline is overrun
+by a millisecond or two at most.
+Searcher.analyse() reports each iteration as it completes, and can be stopped early.
+
+At the horizon a quiescence search takes over, playing out captures and promotions until the
+position is quiet so that scores are not taken in the middle of an exchange. Captures that the
+static exchange evaluator expects to lose material are skipped.
+
+Given an opening book, the search plays straight from the book while the position is in it.
+Given endgame tablebases, positions they cover are scored from them rather than searched.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from chessington.engine.bitboard import popcount
+from chessington.engine.data import Move
+from chessington.engine.evaluation import evaluate
+from chessington.engine.movegen import checkers, generate_legal
+from chessington.engine.ordering import MoveOrderer
+from chessington.engine.see import static_exchange
+from chessington.engine.tt import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+INFINITY = 32000
+MATE_SCORE = 30000
+# Scores beyond this are mates, counted in plies from the root.
+MATE_THRESHOLD = MATE_SCORE - 1000
+DRAW_SCORE = 0
+
+MAX_DEPTH = 64
+# The clock is read once every this many nodes (must be a power of two).
+CHECK_INTERVAL = 32
+# The size of the table search() allocates for a search under a time limit.
+TIMED_TABLE_MB = 1
+# The most pieces, kings included, in any position the tablebases cover.
+TABLEBASE_PIECES = 3
+
+
+class SearchAborted(Exception):
+    """
+    Raised inside the search when it runs out of time.
+    """
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """
+    The outcome of a search: the move to play, its score in centipawns from the point of view of
+    the player to move, the depth completed, the expected line of play and the work done.
+    """
+    best_move: Optional[Move]
+    score: int
+    depth: int
+    principal_variation: List[Move] = field(default_factory=list)
+    nodes: int = 0
+    seconds: float = 0.0
+    first_move_cutoff_rate: float = 0.0
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+
+class Searcher:
+    """
+    Searches positions on a board for the best move, keeping its transposition table between
+    searches, consulting an OpeningBook first and Tablebases along the way if given them.
+    Positions are scored by `evaluate`, a function of the board giving centipawns for the player to
+    move.
+    """
+
+    def __init__(self, board, table=None, book=None, tablebases=None, evaluate=evaluate):
+        self.board = board
+        self.evaluate = evaluate
+        self.table = table if table is not None else TranspositionTable()
+        self.book = book
+        self.tablebases = tablebases
+        self.orderer = MoveOrderer()
+        self.nodes = 0
+        self._start = 0.0
+        self._deadline = None
+        self._stopped = False
+        self._path = []
+        self._pv = [[] for _ in range(MAX_DEPTH + 1)]
+
+    def search(self, max_depth=MAX_DEPTH, time_limit_ms=None, alpha=-INFINITY, beta=INFINITY):
+        """
+        Searches the current position, deepening one ply at a time until `max_depth` is reached or
+        `time_limit_ms` milliseconds have passed, and returns the result of the deepest iteration
+        completed. Without either limit the search runs to MAX_DEPTH.
+
+        Narrowing the window from (alpha, beta) makes the search cheaper, but a score outside the
+        window is only a bound on the true score.
+        """
+        result = None
+        for result in self.analyse(max_depth, time_limit_ms, alpha, beta):
+            pass
+        return SearchResult(result.best_move, result.score, result.depth, result.principal_variation,
+                            self.nodes, time.perf_counter() - self._start, self.orderer.stats.first_move_cutoff_rate)
+
+    def analyse(self, max_depth=MAX_DEPTH, time_limit_ms=None, alpha=-INFINITY, beta=INFINITY):
+        """
+        Searches as search() does, but yields a SearchResult as each iteration completes, so that
+        progress can be shown while the search runs. The first result, at depth 0, is a legal move
+        to fall back on; a position with no legal moves, or one found in the opening book, yields
+        only that.
+
+        Closing the generator, or breaking out of a loop over it, cancels the search between
+        iterations; stop() cancels it in the middle of one.
+        """
+        self._start = start = time.perf_counter()
+        self._deadline = start + time_limit_ms / 1000 if time_limit_ms is not None else None
+        self._stopped = False
+        self.nodes = 0
+        self.table.new_search()
+        self.orderer.new_search()
+        board = self.board
+        root_moves = generate_legal(board, board.colour_index())
+        if not root_moves:
+            score = -MATE_SCORE if checkers(board, board.colour_index()) else DRAW_SCORE
+            yield SearchResult(None, score, 0, seconds=time.perf_counter() - start)
+            return
+        if self.book is not None:
+            book_move = self.book.choose(board)
+            if book_move is not None:
+                yield SearchResult(book_move, 0, 0, [book_move], seconds=time.perf_counter() - start)
+                return
+        # The fallback is the move the search would try first: the table's, then the best capture.
+        entry = self.table.probe(board.zobrist_key)
+        root_moves = self.orderer.order(board, root_moves, 0, entry.move if entry is not None else 0)
+        best_move = board.decode_move(root_moves[0])
+        yield SearchResult(best_move, 0, 0, [best_move])
+
+        stack_depth = len(board.move_stack)
+        for depth in range(1, min(max_depth, MAX_DEPTH) + 1):
+            if self._stopped or (self._deadline is not None and time.perf_counter() >= self._deadline):
+                return
+            self._path = [board.zobrist_key]
+            try:
+                score = self._negamax(depth, alpha, beta, 0)
+            except SearchAborted:
+                while len(board.move_stack) > stack_depth:
+                    board.pop_encoded()
+                return
+            pv = [board.decode_move(move) for move in self._pv[0]]
+            best_move = pv[0] if pv else best_move
+            yield SearchResult(best_move, score, depth, pv, self.nodes, time.perf_counter() - start,
+                               self.orderer.stats.first_move_cutoff_rate)
+            if abs(score) >= MATE_THRESHOLD:
+                return
+
+    def search_move(self, move, max_depth, alpha=-INFINITY, beta=INFINITY):
+        """
+        Searches one encoded move from the current position as the root search would score it,
+        deepening one ply at a time to `max_depth`, so that root moves can be searched separately,
+        such as on other cores. Returns a SearchResult for the move, with the score from the
+        point of view of the player making it; a score outside (alpha, beta) is only a bound.
+        Raises ValueError if `max_depth` is less than 1.
+        """
+        if max_depth < 1:
+            raise ValueError(f'Cannot search a move to depth {max_depth}')
+        self._start = start = time.perf_counter()
+        self._deadline = None
+        self._stopped = False
+        self.nodes = 0
+        self.table.new_search()
+        self.orderer.new_search()
+        board = self.board
+        best_move = board.decode_move(move)
+        self._path = [board.zobrist_key]
+        board.push_encoded(move)
+        self._path.append(board.zobrist_key)
+        try:
+            for depth in range(1, min(max_depth, MAX_DEPTH) + 1):
+                score = -self._negamax(depth - 1, -beta, -alpha, 1)
+        finally:
+            board.pop_encoded()
+        pv = [best_move] + [board.decode_move(reply) for reply in self._pv[1]]
+        return SearchResult(best_move, score, max_depth, pv, self.nodes, time.perf_counter() - start,
+                            self.orderer.stats.first_move_cutoff_rate)
+
+    def stop(self):
+        """
+        Asks a running search, such as one on another thread, to stop as soon as it next checks
+        the clock. The iteration in progress is abandoned.
+        """
+        self._stopped = True
+
+    def _check_time(self):
+        if self._stopped or (self._deadline is not None and time.perf_counter() >= self._deadline):
+            raise SearchAborted()
+
+    def _negamax(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes & (CHECK_INTERVAL - 1):
+            self._check_time()
+
+        board = self.board
+        pv = self._pv
+        pv[ply] = []
+        key = self._path[-1]
+        if ply:
+            if board.halfmove_clock >= 100 or key in self._path[-board.halfmove_clock - 1:-1]:
+                return DRAW_SCORE
+            if self.tablebases is not None and popcount(board.occupied) <= TABLEBASE_PIECES:
+                result = self.tablebases.probe(board)
+                if result is not None:
+                    if result.wdl > 0:
+                        return MATE_SCORE - ply - result.plies_to_mate
+                    if result.wdl < 0:
+                        return -MATE_SCORE + ply + result.plies_to_mate
+                    return DRAW_SCORE
+
+        entry = self.table.probe(key)
+        table_move = 0
+        if entry is not None:
+            table_move = entry.move
+            if ply and entry.depth >= depth:
+                score = _score_from_table(entry.score, ply)
+                if entry.bound == EXACT or (entry.bound == LOWER_BOUND and score >= beta) \
+                        or (entry.bound == UPPER_BOUND and score <= alpha):
+                    return score
+
+        if depth <= 0:
+            return self._quiescence(alpha, beta, ply)
+        colour = board.colour_index()
+        moves = generate_legal(board, colour)
+        if not moves:
+            return -MATE_SCORE + ply if checkers(board, colour) else DRAW_SCORE
+
+        orderer = self.orderer
+        moves = orderer.order(board, moves, ply, table_move)
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = 0
+        path = self._path
+        for move_number, move in enumerate(moves):
+            board.push_encoded(move)
+            path.append(board.zobrist_key)
+            score = -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+            path.pop()
+            board.pop_encoded()
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    pv[ply] = [move] + pv[ply + 1]
+                    if alpha >= beta:
+                        orderer.record_cutoff(move, orderer.is_quiet(board, move), depth, ply, move_number)
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.table.store(key, depth, _score_to_table(best_score, ply), bound, best_move)
+        return best_score
+
+    def _quiescence(self, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes & (CHECK_INTERVAL - 1):
+            self._check_time()
+
+        board = self.board
+        colour = board.colour_index()
+        if ply >= MAX_DEPTH:
+            return self.evaluate(board)
+
+        if checkers(board, colour):
+            # Standing pat is no option in check, so every evasion is searched.
+            moves = generate_legal(board, colour)
+            if not moves:
+                return -MATE_SCORE + ply
+            best_score = -INFINITY
+            in_check = True
+        else:
+            # Stalemates go unnoticed here; telling them apart would mean generating quiet moves.
+            best_score = self.evaluate(board)
+            if best_score >= beta:
+                return best_score
+            alpha = max(alpha, best_score)
+            moves = generate_legal(board, colour, captures_only=True)
+            in_check = False
+
+        for move in self.orderer.order(board, moves, ply):
+            if not in_check and not move >> 12 & 7 and static_exchange(board, move) < 0:
+                continue
+            board.push_encoded(move)
+            score = -self._quiescence(-beta, -alpha, ply + 1)
+            board.pop_encoded()
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
+
+
+def _score_to_table(score, ply):
+    """
+    Mate scores are stored relative to the node rather than the root, so they stay right when the
+    same position turns up at a different ply.
+    """
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+def search(board, max_depth=MAX_DEPTH, time_limit_ms=None, table=None, book=None, tablebases=None):
+    """
+    Finds the best move for the player to move. See Searcher.search.
+
+    A new transposition table is allocated unless one is passed in - under a time limit a small
+    one, as the time allocating it counts against the limit. Callers searching repeatedly should
+    pass a table, or keep a Searcher, to spend all of their time searching.
+    """
+    start = time.perf_counter()
+    if table is None and time_limit_ms is not None:
+        table = TranspositionTable(TIMED_TABLE_MB)
+    searcher = Searcher(board, table, book, tablebases)
+    if time_limit_ms is not None:
+        time_limit_ms = max(0.0, time_limit_ms - (time.perf_counter() - start) * 1000)
+    return searcher.search(max_depth, time_limit_ms)
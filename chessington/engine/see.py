@@ -0,0 +1,63 @@
+"""
+Static exchange evaluation: the material a capture wins or loses once both sides have made every
+worthwhile recapture on the target square, always recapturing with their least valuable piece.
+
+The exchange is played out on occupancy bitboards alone - the board is not changed - and sliding
+pieces lined up behind a capturer join in as soon as it leaves the line. Pins are ignored.
+"""
+
+from chessington.engine.bitboard import PIECE_TYPES
+from chessington.engine.movegen import EN_PASSANT, PAWN, attackers_to
+
+# Indexed by piece type. The king is worth more than any exchange can win back.
+SEE_VALUES = [100, 320, 330, 500, 900, 20000]
+
+
+def static_exchange(board, move):
+    """
+    The expected material gain, in centipawns, of an encoded move for the player making it.
+    """
+    from_index = move & 63
+    to_index = move >> 6 & 63
+    squares = board.squares
+    bitboards = board.bitboards
+    occupancy = board.occupancy
+    occupied = board.occupied
+
+    mover = squares[from_index]
+    side = board.colour_index(mover.player)
+    victim = squares[to_index]
+    if move >> 15 == EN_PASSANT:
+        gain = [SEE_VALUES[PAWN]]
+        occupied ^= 1 << (from_index - from_index % 8 + to_index % 8)
+    else:
+        gain = [SEE_VALUES[victim.piece_type] if victim is not None else 0]
+
+    promotion = move >> 12 & 7
+    attacker_value = SEE_VALUES[promotion or mover.piece_type]
+    if promotion:
+        gain[0] += SEE_VALUES[promotion] - SEE_VALUES[PAWN]
+    from_bit = 1 << from_index
+
+    depth = 0
+    while True:
+        depth += 1
+        gain.append(attacker_value - gain[depth - 1])
+        occupied ^= from_bit
+        side ^= 1
+        attackers = attackers_to(board, to_index, occupied) & occupied & occupancy[side]
+        if not attackers:
+            break
+        base = side * PIECE_TYPES
+        for piece_type in range(PIECE_TYPES):
+            candidates = attackers & bitboards[base + piece_type]
+            if candidates:
+                from_bit = candidates & -candidates
+                attacker_value = SEE_VALUES[piece_type]
+                break
+
+    depth -= 1
+    while depth:
+        gain[depth - 1] = -max(-gain[depth - 1], gain[depth])
+        depth -= 1
+    return gain[0]
@@ -0,0 +1,330 @@
+"""
+Endgame tablebases: every position with a king and one other piece against a lone king, solved
+exactly by retrograde analysis so the search can look the answer up rather than work it out.
+
+The side with the extra piece is always stored as white; positions where black has it are
+looked up with the colours swapped and the board turned over. Without pawns the board has eight
+symmetries, so the strong king is moved into the a1-d1-d4 triangle; with a pawn only the left-right
+mirror applies, so it is moved onto the a-d files. What is left is indexed by side to move, strong
+king, weak king and piece square, one byte per position:
+
+    0           a draw, or not a legal position,
+    n (1-254)   the side to move is mated in n - 1 plies: odd counts win, even ones lose.
+
+Generation works backwards from the mates. Every position's successors are found once with the
+engine's move generator; from then on a position is a win as soon as one successor is a loss,
+and a loss once all of its successors are wins, taking the levels one ply at a time so that
+distances come out right. Promotions are answered from the tables of the pieces promoted to, so
+those must be generated first.
+
+Run `poetry run build-tablebases --help` to generate the files.
+"""
+
+import argparse
+import mmap
+import os
+import sys
+import time
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+from chessington.engine.attacks import KING_ATTACKS
+from chessington.engine.bitboard import BLACK, PIECE_TYPES, WHITE, popcount
+from chessington.engine.board import Board
+from chessington.engine.data import Player, Square
+from chessington.engine.movegen import BISHOP, KING, KNIGHT, PAWN, checkers, generate_legal
+from chessington.engine.pieces import PIECE_CLASSES
+
+# In order of generation: KPK needs the tables of the pieces a pawn can usefully promote to.
+MATERIALS = ['KQK', 'KRK', 'KPK']
+SUFFIX = '.tb'
+# The tables each material set's promotions are answered from.
+_PROMOTIONS = {'KPK': ['KQK', 'KRK']}
+
+_LETTERS = 'PNBRQK'
+
+
+def _transpose(square):
+    return (square & 7) << 3 | square >> 3
+
+
+def _pawnless_map(king):
+    """
+    The board symmetry, as a square-to-square table, taking the given king square into the
+    a1-d1-d4 triangle.
+    """
+    squares = list(range(64))
+    if king & 7 > 3:
+        squares = [square ^ 7 for square in squares]
+        king ^= 7
+    if king >> 3 > 3:
+        squares = [square ^ 56 for square in squares]
+        king ^= 56
+    if king >> 3 > king & 7:
+        squares = [_transpose(square) for square in squares]
+    return tuple(squares)
+
+
+def _pawn_map(king):
+    return tuple(square ^ 7 if king & 7 > 3 else square for square in range(64))
+
+
+_PAWNLESS_MAPS = [_pawnless_map(king) for king in range(64)]
+_PAWN_MAPS = [_pawn_map(king) for king in range(64)]
+_PAWNLESS_SLOTS = {}
+for _king in range(64):
+    _PAWNLESS_SLOTS.setdefault(_PAWNLESS_MAPS[_king][_king], len(_PAWNLESS_SLOTS))
+_PAWN_SLOTS = {king: king // 8 * 4 + king % 8 for king in range(64) if king % 8 < 4}
+
+
+class _Layout:
+    """
+    How the positions of one material set are numbered.
+    """
+
+    def __init__(self, piece_type):
+        self.piece_type = piece_type
+        self.maps = _PAWN_MAPS if piece_type == PAWN else _PAWNLESS_MAPS
+        self.slots = _PAWN_SLOTS if piece_type == PAWN else _PAWNLESS_SLOTS
+        self.king_squares = {slot: king for king, slot in self.slots.items()}
+        self.size = 2 * len(self.slots) * 64 * 64
+
+    def index(self, side, strong_king, weak_king, piece):
+        squares = self.maps[strong_king]
+        return ((side * len(self.slots) + self.slots[squares[strong_king]]) * 64 + squares[weak_king]) * 64 \
+            + squares[piece]
+
+    def position(self, index):
+        """
+        The (side to move, strong king, weak king, piece) squares of a position index.
+        """
+        rest, piece = divmod(index, 64)
+        rest, weak_king = divmod(rest, 64)
+        side, slot = divmod(rest, len(self.slots))
+        return side, self.king_squares[slot], weak_king, piece
+
+
+def _piece_type(material):
+    if len(material) != 3 or material[0] != 'K' or material[2] != 'K' or material[1] not in _LETTERS[:5]:
+        raise ValueError(f'Not a supported material set: {material}')
+    return _LETTERS.index(material[1])
+
+
+def generate(material, promotions=None):
+    """
+    Solves every position of the given material set, such as 'KQK', and returns the table as
+    bytes. `promotions` maps the material set a promotion leads to onto its table; promotions to
+    material not given there count as draws.
+    """
+    piece_type = _piece_type(material)
+    layout = _Layout(piece_type)
+    promotions = promotions or {}
+    promoted_layouts = {_piece_type(name): (_Layout(_piece_type(name)), table) for name, table in promotions.items()}
+
+    values = bytearray(layout.size)
+    remaining = array('H', [0]) * layout.size
+    predecessors = defaultdict(list)
+    # decided[n]: positions found to be mate in n plies. promoted[n]: positions with a promotion
+    # leading to mate in n plies, as read from another table.
+    decided = defaultdict(list)
+    promoted = defaultdict(list)
+
+    board = Board.empty()
+    kings = [PIECE_CLASSES[KING](Player.WHITE), PIECE_CLASSES[KING](Player.BLACK)]
+    piece = PIECE_CLASSES[piece_type](Player.WHITE)
+    placed = []
+    for index in range(layout.size):
+        side, strong_king, weak_king, square = layout.position(index)
+        if len({strong_king, weak_king, square}) < 3 or KING_ATTACKS[strong_king] >> weak_king & 1 \
+                or (piece_type == PAWN and square // 8 in (0, 7)):
+            continue
+        if layout.index(side, strong_king, weak_king, square) != index:
+            continue  # the same position turned by a symmetry, which is stored elsewhere
+
+        for existing in placed:
+            board.set_piece(existing, None)
+        placed = [Square.from_index(strong_king), Square.from_index(weak_king), Square.from_index(square)]
+        for location, occupant in zip(placed, (kings[WHITE], kings[BLACK], piece)):
+            board.set_piece(location, occupant)
+        if checkers(board, 1 - side):
+            continue  # the side not to move cannot be in check
+
+        moves = generate_legal(board, side)
+        if not moves:
+            if checkers(board, side):
+                values[index] = 1
+                decided[0].append(index)
+            continue
+
+        remaining[index] = len(moves)
+        for move in moves:
+            from_index = move & 63
+            to_index = move >> 6 & 63
+            if side == BLACK:
+                if to_index == square:
+                    continue  # the piece is captured, and the game drawn
+                successor = layout.index(WHITE, strong_king, to_index, square)
+            elif move >> 12 & 7:
+                if move >> 12 & 7 in promoted_layouts:
+                    promoted_layout, table = promoted_layouts[move >> 12 & 7]
+                    value = table[promoted_layout.index(BLACK, strong_king, weak_king, to_index)]
+                    if value:
+                        promoted[value - 1].append(index)
+                continue
+            elif from_index == strong_king:
+                successor = layout.index(BLACK, to_index, weak_king, square)
+            else:
+                successor = layout.index(BLACK, strong_king, weak_king, to_index)
+            predecessors[successor].append(index)
+
+    for ply in range(253):
+        if not decided and not promoted:
+            break
+        groups = [predecessors.get(position, ()) for position in decided.pop(ply, ())]
+        groups.append(promoted.pop(ply, ()))
+        for group in groups:
+            for index in group:
+                if values[index]:
+                    continue
+                if ply % 2:
+                    # A successor is won for the opponent: only once they all are is this lost.
+                    remaining[index] -= 1
+                    if remaining[index]:
+                        continue
+                values[index] = ply + 2
+                decided[ply + 1].append(index)
+    return bytes(values)
+
+
+def write_tables(directory, materials=MATERIALS, report=None):
+    """
+    Generates the tables for the given material sets, in order, into files in `directory`, each
+    named after its material set. The tables promotions lead to are read from `directory` if they
+    are there, and generated into it first if not. `report`, if given, is called with each material
+    set generated and the seconds it took.
+    """
+    os.makedirs(directory, exist_ok=True)
+    tables = {}
+
+    def write(material):
+        start = time.perf_counter()
+        promotions = {name: table(name) for name in _PROMOTIONS.get(material, ())}
+        tables[material] = generate(material, promotions)
+        with open(os.path.join(directory, material + SUFFIX), 'wb') as file:
+            file.write(tables[material])
+        if report is not None:
+            report(material, time.perf_counter() - start)
+
+    def table(material):
+        if material not in tables:
+            path = os.path.join(directory, material + SUFFIX)
+            if os.path.exists(path):
+                with open(path, 'rb') as file:
+                    tables[material] = file.read()
+            else:
+                write(material)
+        return tables[material]
+
+    for material in materials:
+        write(material)
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """
+    The true result of a position with perfect play, for the player to move: 1 for a win, 0 for a
+    draw, -1 for a loss, and how many plies until the mate.
+    """
+    wdl: int
+    plies_to_mate: Optional[int] = None
+
+
+DRAW = ProbeResult(0)
+
+
+class Tablebases:
+    """
+    The table files found in a directory, opened for probing. Use as a context manager, or call
+    close() when done.
+    """
+
+    def __init__(self, directory):
+        self._tables = {}
+        for material in MATERIALS:
+            path = os.path.join(directory, material + SUFFIX)
+            if os.path.exists(path):
+                with open(path, 'rb') as file:
+                    table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                piece_type = _piece_type(material)
+                self._tables[piece_type] = (_Layout(piece_type), table)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for _, table in self._tables.values():
+            table.close()
+        self._tables = {}
+
+    @property
+    def materials(self):
+        return ['K' + _LETTERS[piece_type] + 'K' for piece_type in sorted(self._tables)]
+
+    def probe(self, board):
+        """
+        Looks up the board's position, returning a ProbeResult, or None if the position is not
+        covered by the tables opened.
+        """
+        occupied = board.occupied
+        pieces = popcount(occupied)
+        if pieces == 2:
+            return DRAW
+        if pieces != 3:
+            return None
+        bitboards = board.bitboards
+        kings = bitboards[KING] | bitboards[PIECE_TYPES + KING]
+        square = (occupied ^ kings).bit_length() - 1
+        code = next(code for code in range(2 * PIECE_TYPES) if bitboards[code] >> square & 1)
+        strong, piece_type = divmod(code, PIECE_TYPES)
+        if piece_type in (BISHOP, KNIGHT):
+            return DRAW  # a lone minor piece cannot mate
+        if piece_type not in self._tables:
+            return None
+
+        # Turn the board over if need be, so the strong side is white.
+        flip = 56 if strong == BLACK else 0
+        strong_king = (bitboards[strong * PIECE_TYPES + KING].bit_length() - 1) ^ flip
+        weak_king = (bitboards[(1 - strong) * PIECE_TYPES + KING].bit_length() - 1) ^ flip
+        side = WHITE if board.colour_index() == strong else BLACK
+
+        layout, table = self._tables[piece_type]
+        value = table[layout.index(side, strong_king, weak_king, square ^ flip)]
+        if not value:
+            return DRAW
+        plies = value - 1
+        return ProbeResult(1 if plies % 2 else -1, plies)
+
+
+def main(argv=None):
+    """
+    Command line entry point: generates the tablebase files.
+    """
+    parser = argparse.ArgumentParser(description='Generate endgame tablebases.')
+    parser.add_argument('directory', help='where to write the table files')
+    parser.add_argument('--material', action='append', choices=MATERIALS,
+                        help='only generate this material set (may be repeated)')
+    args = parser.parse_args(argv)
+
+    materials = [material for material in MATERIALS if args.material is None or material in args.material]
+    write_tables(args.directory, materials,
+                 lambda material, seconds: print(f'{material}: generated in {seconds:.1f}s'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
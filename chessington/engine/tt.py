@@ -0,0 +1,154 @@
+"""
+A fixed-size transposition table for caching search results by position hash.
+
+The table is two preallocated arrays of 64-bit integers - one of keys and one of packed entries -
+so its memory use is fixed when it is created, whatever is stored in it. Entries are grouped into
+buckets of two: the first slot keeps the deepest (or most recent search's) result for its bucket,
+while the second always takes whatever the first turned away.
+"""
+
+from array import array
+from dataclasses import dataclass
+
+EXACT = 1
+LOWER_BOUND = 2
+UPPER_BOUND = 3
+
+SLOTS_PER_BUCKET = 2
+BYTES_PER_SLOT = 16
+MEGABYTE = 1024 * 1024
+
+# Layout of a packed entry, lowest bits first.
+_MOVE_BITS = 17
+_SCORE_SHIFT = _MOVE_BITS
+_DEPTH_SHIFT = _SCORE_SHIFT + 16
+_BOUND_SHIFT = _DEPTH_SHIFT + 8
+_GENERATION_SHIFT = _BOUND_SHIFT + 2
+_MOVE_MASK = (1 << _MOVE_BITS) - 1
+_SCORE_OFFSET = 1 << 15
+MAX_SCORE = _SCORE_OFFSET - 1
+MAX_DEPTH = 255
+
+
+@dataclass(frozen=True)
+class Entry:
+    """
+    A stored search result. The move is in the engine's encoded form, or 0 if none was found.
+    """
+    move: int
+    score: int
+    depth: int
+    bound: int
+
+
+@dataclass
+class TableStats:
+    """
+    Counters describing how well the table is serving a search.
+    """
+    probes: int = 0
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    collisions: int = 0
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+
+class TranspositionTable:
+    """
+    A hash table of search results with a fixed memory budget, given in megabytes.
+    """
+
+    def __init__(self, size_mb=16):
+        self.buckets = max(1, int(size_mb * MEGABYTE) // (SLOTS_PER_BUCKET * BYTES_PER_SLOT))
+        self.size_mb = size_mb
+        self.generation = 0
+        self.stats = TableStats()
+        self._keys = array('Q', bytes(8 * SLOTS_PER_BUCKET * self.buckets))
+        self._entries = array('Q', bytes(8 * SLOTS_PER_BUCKET * self.buckets))
+
+    def new_search(self):
+        """
+        Marks the start of a new search, so that entries left over from earlier searches give way
+        to new ones in the depth-preferred slots.
+        """
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        """
+        Empties the table and resets its counters.
+        """
+        self._keys = array('Q', bytes(8 * len(self._keys)))
+        self._entries = array('Q', bytes(8 * len(self._entries)))
+        self.generation = 0
+        self.stats = TableStats()
+
+    def probe(self, key):
+        """
+        Looks up the given position hash, returning its Entry or None.
+        """
+        stats = self.stats
+        stats.probes += 1
+        slot = (key % self.buckets) * SLOTS_PER_BUCKET
+        keys = self._keys
+        if keys[slot] != key or not self._entries[slot]:
+            slot += 1
+            if keys[slot] != key or not self._entries[slot]:
+                stats.misses += 1
+                return None
+        stats.hits += 1
+        packed = self._entries[slot]
+        return Entry(
+            packed & _MOVE_MASK,
+            (packed >> _SCORE_SHIFT & 0xFFFF) - _SCORE_OFFSET,
+            packed >> _DEPTH_SHIFT & 0xFF,
+            packed >> _BOUND_SHIFT & 3,
+        )
+
+    def store(self, key, depth, score, bound, move=0):
+        """
+        Records a search result for the given position hash. Scores are clamped to 16 bits and
+        depths to 8 bits.
+        """
+        score = max(-MAX_SCORE, min(MAX_SCORE, score))
+        packed = (move
+                  | (score + _SCORE_OFFSET) << _SCORE_SHIFT
+                  | min(max(depth, 0), MAX_DEPTH) << _DEPTH_SHIFT
+                  | bound << _BOUND_SHIFT
+                  | self.generation << _GENERATION_SHIFT)
+        keys = self._keys
+        entries = self._entries
+        slot = (key % self.buckets) * SLOTS_PER_BUCKET
+        self.stats.stores += 1
+
+        existing = entries[slot]
+        if keys[slot] == key or not existing or depth >= (existing >> _DEPTH_SHIFT & 0xFF) \
+                or existing >> _GENERATION_SHIFT != self.generation:
+            if existing and keys[slot] != key:
+                # Demote the previous occupant rather than losing it outright.
+                self._replace(slot + 1, keys[slot], existing)
+            self._replace(slot, key, packed)
+        else:
+            self._replace(slot + 1, key, packed)
+
+    def _replace(self, slot, key, packed):
+        if self._entries[slot] and self._keys[slot] != key:
+            self.stats.collisions += 1
+        self._keys[slot] = key
+        self._entries[slot] = packed
+
+    def hashfull(self):
+        """
+        The number of slots in use per thousand, sampled from the start of the table.
+        """
+        sample = self._entries[:min(len(self._entries), 1000)]
+        return sum(1 for packed in sample if packed) * 1000 // len(sample)
+
+    def memory_bytes(self):
+        """
+        The number of bytes held by the table's arrays.
+        """
+        return (len(self._keys) + len(self._entries)) * self._keys.itemsize
@@ -0,0 +1,27 @@
+"""
+Random keys for Zobrist hashing of positions.
+
+A position's key is the XOR of one key per piece on the board (by kind, colour and square), one
+for the castling rights still standing, one for the file of a capturable en passant square, and
+one more when black is to move. The keys come from a fixed seed so that hashes are stable across
+runs and processes.
+"""
+
+from random import Random
+
+_random = Random(0x0C4E55)
+
+# PIECE_KEYS[piece code][square], where the piece code is the index of the piece's bitboard.
+PIECE_KEYS = [[_random.getrandbits(64) for _ in range(64)] for _ in range(12)]
+# CASTLING_KEYS[castling rights], with each right's bit keyed independently.
+_CASTLING_BITS = [_random.getrandbits(64) for _ in range(4)]
+CASTLING_KEYS = [0] * 16
+for _rights in range(16):
+    for _bit, _key in enumerate(_CASTLING_BITS):
+        if _rights >> _bit & 1:
+            CASTLING_KEYS[_rights] ^= _key
+# EN_PASSANT_KEYS[file]
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(8)]
+BLACK_TO_MOVE_KEY = _random.getrandbits(64)
+
+del _random, _rights, _bit, _key
@@ -0,0 +1,69 @@
+"""
+Building opening books from the games in PGN files.
+
+Each game's first moves are replayed from the starting position, and every move is counted
+against the position it was played from; the counts become the weights of the book's entries.
+See chessington.engine.book for the file format and for looking moves up.
+
+Run `poetry run build-book --help` to build a book from a PGN file.
+"""
+
+import argparse
+import sys
+from collections import Counter
+
+from chessington.engine.board import Board
+from chessington.engine.book import ENTRY, MAX_WEIGHT
+from chessington.engine.movegen import parse_san, strip_move
+from chessington.io.pgn import open_games
+
+DEFAULT_MAX_PLY = 24
+
+
+def build_book(games, path, max_ply=DEFAULT_MAX_PLY, min_count=1):
+    """
+    Writes a book to `path` from an iterable of games, each a list of moves in SAN played from the
+    starting position. Only the first `max_ply` moves of each game are used, and moves played fewer
+    than `min_count` times are left out. Games with an illegal move are used up to that move.
+    Returns the number of entries written.
+    """
+    counts = Counter()
+    for moves in games:
+        board = Board.at_starting_position()
+        for san in moves[:max_ply]:
+            try:
+                move = parse_san(board, san)
+            except ValueError:
+                break
+            counts[board.zobrist_key, strip_move(move)] += 1
+            board.push_encoded(move)
+
+    entries = sorted((key, move, min(count, MAX_WEIGHT)) for (key, move), count in counts.items()
+                     if count >= min_count)
+    with open(path, 'wb') as file:
+        for entry in entries:
+            file.write(ENTRY.pack(*entry))
+    return len(entries)
+
+
+def main(argv=None):
+    """
+    Command line entry point: builds an opening book from a PGN file.
+    """
+    parser = argparse.ArgumentParser(description='Build an opening book from a PGN file.')
+    parser.add_argument('pgn', help='the games to learn from')
+    parser.add_argument('book', help='the book file to write')
+    parser.add_argument('--max-ply', type=int, default=DEFAULT_MAX_PLY,
+                        help=f'how many moves of each game to use (default {DEFAULT_MAX_PLY})')
+    parser.add_argument('--min-count', type=int, default=1,
+                        help='leave out moves played fewer times than this (default 1)')
+    args = parser.parse_args(argv)
+
+    games = (game.moves for game in open_games(args.pgn) if 'FEN' not in game.headers)
+    entries = build_book(games, args.book, args.max_ply, args.min_count)
+    print(f'wrote {entries} entries to {args.book}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+An index of the positions in a collection of games, kept in an SQLite database, for asking how
+often a position occurred and which moves were played from it.
+
+Positions are keyed by their Zobrist key, and the moves played from them are stored without
+their special-move flags, as in an opening book. Both tables are keyed on the position, so a
+lookup is a single B-tree search however many positions the index holds. Positions are counted
+in memory and written in large sorted batches, each in one transaction, which keeps building an
+index from millions of games to a steady stream of page writes.
+
+Run `poetry run build-index --help` to index a PGN file.
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from collections import Counter
+
+from chessington.engine.movegen import restore_moves, strip_move
+from chessington.io.pgn import open_games, replay
+
+DEFAULT_BATCH_SIZE = 200000
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS positions (key INTEGER PRIMARY KEY, count INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS moves (
+    key INTEGER NOT NULL, move INTEGER NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (key, move)
+) WITHOUT ROWID;
+'''
+
+
+def _signed(key):
+    """
+    A 64-bit Zobrist key as SQLite stores integers: signed.
+    """
+    return key - (1 << 64) if key >> 63 else key
+
+
+class PositionIndex:
+    """
+    An index database, created if need be, opened for adding games and looking positions up.
+    Games added are held in memory until `batch_size` positions have been seen, or until flush()
+    or close(). Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._positions = Counter()
+        self._moves = Counter()
+        self._pending = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
+
+    def __len__(self):
+        """
+        The number of distinct positions in the index.
+        """
+        self.flush()
+        return self._connection.execute('SELECT COUNT(*) FROM positions').fetchone()[0]
+
+    def add(self, board, move=None):
+        """
+        Counts the board's position, and the encoded move played from it if any.
+        """
+        key = _signed(board.zobrist_key)
+        self._positions[key] += 1
+        if move is not None:
+            self._moves[key, strip_move(move)] += 1
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def add_game(self, game):
+        """
+        Counts every position of a game from the pgn module, and the moves played from them,
+        including the final position. A game with an illegal move is counted up to the position
+        it was played from. Returns the number of positions counted.
+        """
+        board = game.starting_board()
+        positions = 0
+        try:
+            for _, move in replay(game, board):
+                self.add(board, move)
+                positions += 1
+        except ValueError:
+            pass  # the position reached still counts
+        self.add(board)
+        return positions + 1
+
+    def flush(self):
+        """
+        Writes the positions counted so far to the database.
+        """
+        if not self._pending:
+            return
+        with self._connection:
+            # Sorted keys touch the B-tree pages in order.
+            positions = sorted(self._positions.items())
+            self._connection.executemany('INSERT OR IGNORE INTO positions VALUES (?, 0)',
+                                         [(key,) for key, _ in positions])
+            self._connection.executemany('UPDATE positions SET count = count + ? WHERE key = ?',
+                                         [(count, key) for key, count in positions])
+            moves = sorted(self._moves.items())
+            self._connection.executemany('INSERT OR IGNORE INTO moves VALUES (?, ?, 0)',
+                                         [key_move for key_move, _ in moves])
+            self._connection.executemany('UPDATE moves SET count = count + ? WHERE key = ? AND move = ?',
+                                         [(count, key, move) for (key, move), count in moves])
+        self._positions.clear()
+        self._moves.clear()
+        self._pending = 0
+
+    def count(self, board):
+        """
+        How many times the board's position occurred in the games indexed.
+        """
+        self.flush()
+        row = self._connection.execute('SELECT count FROM positions WHERE key = ?',
+                                       (_signed(board.zobrist_key),)).fetchone()
+        return row[0] if row else 0
+
+    def moves(self, board):
+        """
+        Lists the moves played from the board's position as (Move, times played) pairs, most played
+        first, leaving out any that are not legal in the position.
+        """
+        self.flush()
+        rows = self._connection.execute('SELECT move, count FROM moves WHERE key = ? ORDER BY count DESC',
+                                        (_signed(board.zobrist_key),)).fetchall()
+        if not rows:
+            return []
+        return [(board.decode_move(move), count) for move, count in restore_moves(board, rows)]
+
+
+def build_index(pgn, path, batch_size=DEFAULT_BATCH_SIZE, report=None):
+    """
+    Adds every game in a PGN file to the index at `path`, returning the number of games and of
+    positions counted. `report`, if given, is called with the games and positions counted after
+    every batch_size positions.
+    """
+    games = positions = 0
+    next_report = batch_size
+    with PositionIndex(path, batch_size) as index:
+        for game in open_games(pgn):
+            try:
+                positions += index.add_game(game)
+            except ValueError:
+                continue  # a starting position that cannot be read
+            games += 1
+            if report is not None and positions >= next_report:
+                report(games, positions)
+                next_report += batch_size
+    return games, positions
+
+
+def main(argv=None):
+    """
+    Command line entry point: indexes the positions of a PGN file.
+    """
+    parser = argparse.ArgumentParser(description='Index the positions in a PGN file.')
+    parser.add_argument('pgn', help='the games to index')
+    parser.add_argument('index', help='the database to add them to')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'positions to count in memory before writing (default {DEFAULT_BATCH_SIZE})')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def report(games, positions):
+        seconds = time.perf_counter() - start
+        print(f'{games} games, {positions} positions ({positions / seconds:.0f} positions/s)', file=sys.stderr)
+
+    games, positions = build_index(args.pgn, args.index, args.batch_size, report)
+    print(f'indexed {positions} positions from {games} games in {time.perf_counter() - start:.2f}s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
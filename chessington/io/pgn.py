@@ -0,0 +1,219 @@
+"""
+Reading games in Portable Game Notation.
+
+A PGN file is a sequence of games, each a block of [Tag "value"] header lines followed by the
+moves in Standard Algebraic Notation (SAN), interleaved with move numbers, comments, variations and
+annotations, and ending in the result. Only the main line is kept.
+
+Files are read through mmap a line at a time, and games are handed out one by one as soon as they
+are complete, so memory use does not grow with the size of the file. Each game's moves can then be
+replayed onto a Board, checking them against the rules as they go.
+
+Run `poetry run replay-pgn --help` to replay a file and see how fast it goes.
+"""
+
+import argparse
+import mmap
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from chessington.engine.board import Board
+from chessington.engine.movegen import parse_san
+
+_RESULTS = {'1-0', '0-1', '1/2-1/2', '*'}
+
+_HEADER = re.compile(r'\[(\w+)\s+"((?:[^"\\]|\\.)*)"\]')
+# Characters that open or close a comment or variation, which can run over several lines.
+_COMMENT_OR_VARIATION = re.compile(r'[{};()]')
+# Comments, variations (which never contain games of their own), move numbers and annotations.
+_NOISE = re.compile(r'\{[^}]*\}|;[^\n]*|\$\d+|\d+\.(?:\.\.)?|[!?]+')
+
+
+@dataclass
+class Game:
+    """
+    One game from a PGN file: its headers and its main line moves in SAN.
+    """
+    headers: Dict[str, str] = field(default_factory=dict)
+    moves: List[str] = field(default_factory=list)
+
+    def starting_board(self):
+        """
+        A new board at the game's starting position: from its FEN header if it has one.
+        """
+        if 'FEN' in self.headers:
+            return Board.from_fen(self.headers['FEN'])
+        return Board.at_starting_position()
+
+
+class IllegalMoveError(ValueError):
+    """
+    Raised when replaying a game comes to a move that cannot be played. `ply` counts the moves
+    played before it.
+    """
+
+    def __init__(self, message, ply, san):
+        super().__init__(message)
+        self.ply = ply
+        self.san = san
+
+
+def replay(game, board=None):
+    """
+    Plays a game's moves on a board - by default a new one at the game's starting position -
+    yielding (board, encoded move) before each move is made, so the position it was played from
+    can be looked at. The board is left at the final position. Raises IllegalMoveError at the
+    first move that cannot be played.
+    """
+    board = board if board is not None else game.starting_board()
+    for ply, san in enumerate(game.moves):
+        try:
+            move = parse_san(board, san)
+        except ValueError as error:
+            raise IllegalMoveError(f'Move {ply // 2 + 1}{"." if ply % 2 == 0 else "..."} {san}: {error}',
+                                   ply, san) from None
+        yield board, move
+        board.push_encoded(move)
+
+
+def read_games(lines):
+    """
+    Yields each game in an iterable of PGN lines, such as an open text file, as soon as it has
+    been read. A game ends at its result, or failing that at the next game's tags.
+    """
+    game = Game()
+    movetext = []
+    comment = False
+    variations = 0
+    for line in lines:
+        line = line.strip()
+        if not comment:
+            if line.startswith('['):
+                match = _HEADER.match(line)
+                if match and movetext:
+                    # The game before had no result: these tags start the next one.
+                    game.moves = _main_line('\n'.join(movetext))
+                    yield game
+                    game, movetext, variations = Game(), [], 0
+                if match:
+                    game.headers[match.group(1)] = match.group(2)
+                    continue
+                if not movetext:
+                    continue
+            if not line or line.startswith('%'):
+                continue
+        movetext.append(line)
+        outside, comment, variations = _outside_comments(line, comment, variations)
+        tokens = outside.split()
+        if not comment and not variations and tokens and tokens[-1] in _RESULTS:
+            game.moves = _main_line('\n'.join(movetext))
+            yield game
+            game, movetext = Game(), []
+    if movetext:
+        game.moves = _main_line('\n'.join(movetext))
+        yield game
+
+
+def _outside_comments(line, comment, variations):
+    """
+    The text of a line of movetext outside comments, given whether the line starts inside a
+    {comment} and how many variations deep. Returns it with the same two for the next line.
+    """
+    if not comment and not _COMMENT_OR_VARIATION.search(line):
+        return line, False, variations
+    outside = []
+    for char in line:
+        if comment:
+            comment = char != '}'
+        elif char == '{':
+            comment = True
+        elif char == ';':
+            break  # the rest of the line is a comment
+        else:
+            if char == '(':
+                variations += 1
+            elif char == ')' and variations:
+                variations -= 1
+            outside.append(char)
+    return ''.join(outside), comment, variations
+
+
+def open_games(path):
+    """
+    Yields each game in a PGN file, reading the file through mmap so that only the game being
+    read is held in memory.
+    """
+    with open(path, 'rb') as file:
+        if not file.seek(0, 2):
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # utf-8-sig drops the byte order mark some tools write at the start of the file.
+            lines = (line.decode('utf-8-sig', 'replace') for line in iter(data.readline, b''))
+            yield from read_games(lines)
+
+
+def _main_line(movetext):
+    text = _NOISE.sub(' ', movetext)
+    # Variations can nest, so strip them from the innermost outwards.
+    previous = None
+    while previous != text:
+        previous = text
+        text = re.sub(r'\([^()]*\)', ' ', text)
+    return [token for token in text.split() if token not in _RESULTS]
+
+
+@dataclass
+class ReplayStats:
+    """
+    What replaying a PGN file came to.
+    """
+    games: int = 0
+    moves: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def games_per_second(self):
+        return self.games / self.seconds if self.seconds else 0.0
+
+
+def replay_file(path, report=None):
+    """
+    Replays every game in a PGN file, returning ReplayStats. `report`, if given, is called with
+    the number of each game that could not be replayed and the ValueError - an IllegalMoveError
+    or a bad FEN header - that stopped it.
+    """
+    stats = ReplayStats()
+    start = time.perf_counter()
+    for number, game in enumerate(open_games(path), start=1):
+        stats.games += 1
+        try:
+            for _ in replay(game):
+                stats.moves += 1
+        except ValueError as error:
+            stats.errors += 1
+            if report is not None:
+                report(number, error)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def main(argv=None):
+    """
+    Command line entry point: replays every game in a PGN file, reporting illegal moves and speed.
+    """
+    parser = argparse.ArgumentParser(description='Replay the games in a PGN file.')
+    parser.add_argument('pgn', help='the file to replay')
+    args = parser.parse_args(argv)
+
+    stats = replay_file(args.pgn, lambda number, error: print(f'game {number}: {error}'))
+    print(f'{stats.games} games, {stats.moves} moves, {stats.errors} with errors in {stats.seconds:.2f}s '
+          f'({stats.games_per_second:.0f} games/s)')
+    return 1 if stats.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
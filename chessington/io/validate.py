@@ -0,0 +1,155 @@
+"""
+Checking large collections of games on several cores at once.
+
+The games of a PGN file are read one at a time and handed out in chunks to a pool of processes,
+each of which replays its games with the engine: every move is checked against the rules, and
+counts of captures and checks are taken along the way. A few chunks are kept in flight per
+worker, and their reports are collected strictly in the order of the file, so the results can be
+written out as they arrive while memory stays flat.
+
+Run `poetry run validate-pgn --help` for the options.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from chessington.engine.movegen import EN_PASSANT, checkers
+from chessington.io.pgn import ReplayStats, open_games, replay
+
+DEFAULT_CHUNK_SIZE = 64
+# How many chunks each worker may have waiting, so that none of them runs dry.
+CHUNKS_PER_WORKER = 2
+
+
+@dataclass
+class GameReport:
+    """
+    What replaying one game found. `number` counts games from 1 in the order of the file. On an
+    illegal move, `error` says which, and the other fields describe the game up to that move; given
+    a starting position that cannot be read, there is no final position.
+    """
+    number: int
+    white: str
+    black: str
+    result: str
+    plies: int = 0
+    captures: int = 0
+    checks: int = 0
+    final_fen: Optional[str] = None
+    error: Optional[str] = None
+
+
+def validate_game(number, game):
+    """
+    Replays a game, returning its GameReport.
+    """
+    headers = game.headers
+    report = GameReport(number, headers.get('White', '?'), headers.get('Black', '?'), headers.get('Result', '*'))
+    try:
+        board = game.starting_board()
+    except ValueError as error:
+        report.error = str(error)
+        return report
+    try:
+        for _, move in replay(game, board):
+            # The position each move is played from is the one the previous move left behind.
+            if report.plies and checkers(board, board.colour_index()):
+                report.checks += 1
+            if board.squares[move >> 6 & 63] is not None or move >> 15 == EN_PASSANT:
+                report.captures += 1
+            report.plies += 1
+        if report.plies and checkers(board, board.colour_index()):
+            report.checks += 1
+    except ValueError as error:
+        report.error = str(error)
+    report.final_fen = board.to_fen()
+    return report
+
+
+def _validate_chunk(first_number, games):
+    return [validate_game(first_number + offset, game) for offset, game in enumerate(games)]
+
+
+def _chunks(games, chunk_size):
+    """
+    Yields (number of the first game, list of games) for successive chunks of the games.
+    """
+    chunk = []
+    number = 1
+    for game in games:
+        chunk.append(game)
+        if len(chunk) == chunk_size:
+            yield number, chunk
+            number += len(chunk)
+            chunk = []
+    if chunk:
+        yield number, chunk
+
+
+def validate_file(path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields a GameReport for every game in a PGN file, in the order of the file, replaying them on
+    `workers` processes (by default one per core). With one worker the games are replayed in this
+    process.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(open_games(path), chunk_size)
+    if workers == 1:
+        for number, chunk in chunks:
+            yield from _validate_chunk(number, chunk)
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for number, chunk in chunks:
+            pending.append(pool.submit(_validate_chunk, number, chunk))
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main(argv=None):
+    """
+    Command line entry point: replays every game in a PGN file, writing a JSON line per game.
+    """
+    parser = argparse.ArgumentParser(description='Check every game in a PGN file, on several cores.')
+    parser.add_argument('pgn', help='the games to check')
+    parser.add_argument('output', help='where to write a line of JSON per game, or - for standard output')
+    parser.add_argument('--workers', type=int, default=None, help='processes to use (default: one per core)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'games handed to a process at a time (default {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--progress', type=int, default=1000, help='report progress every this many games')
+    args = parser.parse_args(argv)
+
+    stats = ReplayStats()
+    start = time.perf_counter()
+    output = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        for report in validate_file(args.pgn, args.workers, args.chunk_size):
+            output.write(json.dumps(asdict(report)) + '\n')
+            stats.games += 1
+            stats.moves += report.plies
+            stats.errors += report.error is not None
+            if args.progress and stats.games % args.progress == 0:
+                stats.seconds = time.perf_counter() - start
+                print(f'{stats.games} games, {stats.errors} with errors ({stats.games_per_second:.0f} games/s)',
+                      file=sys.stderr)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    stats.seconds = time.perf_counter() - start
+    print(f'{stats.games} games, {stats.moves} moves, {stats.errors} with errors in {stats.seconds:.2f}s '
+          f'({stats.games_per_second:.0f} games/s)', file=sys.stderr)
+    return 1 if stats.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+from random import Random
+
+from chessington.engine.attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, PAWN_PUSHES, PAWN_DOUBLE_PUSHES
+from chessington.engine.attacks import bishop_attacks, rook_attacks, queen_attacks
+from chessington.engine.bitboard import popcount, square_index
+
+def test_knight_attacks_in_corner_and_centre():
+
+    # Act
+    corner = KNIGHT_ATTACKS[square_index(0, 0)]
+    centre = KNIGHT_ATTACKS[square_index(4, 4)]
+
+    # Assert
+    assert corner == (1 << square_index(1, 2)) | (1 << square_index(2, 1))
+    assert popcount(centre) == 8
+
+def test_king_attacks_on_edge():
+
+    # Act
+    attacks = KING_ATTACKS[square_index(0, 4)]
+
+    # Assert
+    assert popcount(attacks) == 5
+    assert attacks & (1 << square_index(0, 4)) == 0
+
+def test_pawn_attacks_do_not_wrap_around_the_board():
+
+    # Act
+    white = PAWN_ATTACKS[0][square_index(3, 7)]
+    black = PAWN_ATTACKS[1][square_index(3, 0)]
+
+    # Assert
+    assert white == 1 << square_index(4, 6)
+    assert black == 1 << square_index(2, 1)
+
+def test_pawn_double_pushes_only_from_starting_row():
+
+    # Act
+    white_start = PAWN_DOUBLE_PUSHES[0][square_index(1, 3)]
+    white_moved = PAWN_DOUBLE_PUSHES[0][square_index(2, 3)]
+    black_start = PAWN_DOUBLE_PUSHES[1][square_index(6, 3)]
+
+    # Assert
+    assert white_start == 1 << square_index(3, 3)
+    assert white_moved == 0
+    assert black_start == 1 << square_index(4, 3)
+    assert PAWN_PUSHES[0][square_index(7, 3)] == 0
+
+def _walk(index, occupied, directions):
+    attacks = 0
+    for vertical, horizontal in directions:
+        row, col = divmod(index, 8)
+        row, col = row + vertical, col + horizontal
+        while 0 <= row < 8 and 0 <= col < 8:
+            attacks |= 1 << square_index(row, col)
+            if occupied & (1 << square_index(row, col)):
+                break
+            row, col = row + vertical, col + horizontal
+    return attacks
+
+def test_sliding_attacks_match_walking_the_rays():
+
+    # Arrange
+    random = Random(1234)
+    diagonals = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+    lines = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+    for _ in range(500):
+        index = random.randrange(64)
+        occupied = random.getrandbits(64) & random.getrandbits(64)
+
+        # Act / Assert
+        assert bishop_attacks(index, occupied) == _walk(index, occupied, diagonals)
+        assert rook_attacks(index, occupied) == _walk(index, occupied, lines)
+        assert queen_attacks(index, occupied) == _walk(index, occupied, diagonals + lines)
+
+def test_rook_attacks_stop_at_first_blocker():
+
+    # Arrange
+    occupied = (1 << square_index(4, 6)) | (1 << square_index(4, 7))
+
+    # Act
+    attacks = rook_attacks(square_index(4, 4), occupied)
+
+    # Assert
+    assert attacks & (1 << square_index(4, 6))
+    assert attacks & (1 << square_index(4, 7)) == 0
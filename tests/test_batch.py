@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from chessington.engine import batch
+from chessington.engine.board import Board
+from chessington.engine.evaluation import evaluate
+from chessington.engine.movegen import generate_legal, is_attacked
+from chessington.engine.perft import REFERENCE_POSITIONS
+
+def _sample_boards():
+    """
+    The reference positions and positions from random games, with castling and en passant taken
+    away since a batch does not hold them.
+    """
+    rng = random.Random(7)
+    boards = [Board.from_fen(position.fen) for position in REFERENCE_POSITIONS]
+    for _ in range(40):
+        board = Board.at_starting_position()
+        for _ in range(rng.randrange(10, 80)):
+            moves = generate_legal(board, board.colour_index())
+            if not moves:
+                break
+            board.push_encoded(rng.choice(moves))
+        boards.append(board)
+    for board in boards:
+        board.castling_rights = 0
+        board.en_passant = None
+    return boards
+
+BOARDS = _sample_boards()
+
+def test_mobility_matches_available_moves():
+
+    # Arrange
+    bitboards, colours = batch.from_boards(BOARDS)
+
+    # Act
+    counts = batch.mobility(bitboards, colours)
+
+    # Assert
+    expected = [sum(len(piece.get_available_moves(board)) for piece in board.get_pieces(board.current_player))
+                for board in BOARDS]
+    assert counts.tolist() == expected
+
+def test_attack_masks_match_single_square_checks():
+
+    # Arrange
+    bitboards, _ = batch.from_boards(BOARDS)
+
+    # Act
+    masks = batch.attack_masks(bitboards)
+
+    # Assert
+    for board, (white, black) in zip(BOARDS, masks.tolist()):
+        for index in range(64):
+            assert bool(white >> index & 1) == is_attacked(board, index, 0, board.occupied)
+            assert bool(black >> index & 1) == is_attacked(board, index, 1, board.occupied)
+
+def test_evaluate_matches_single_position_evaluation():
+
+    # Arrange
+    bitboards, colours = batch.from_boards(BOARDS)
+
+    # Act
+    scores = batch.evaluate(bitboards, colours)
+
+    # Assert
+    assert scores.tolist() == [evaluate(board) for board in BOARDS]
+
+def test_mobility_sees_checks_and_pins():
+
+    # Arrange
+    boards = [
+        Board.from_fen('4k3/8/8/8/8/8/4r3/R3K3 w - - 0 1'),
+        Board.from_fen('4k3/4r3/8/8/8/8/4B3/4K3 w - - 0 1'),
+        Board.from_fen('4k3/8/8/8/1b6/8/3N4/4K3 w - - 0 1'),
+    ]
+    bitboards, colours = batch.from_boards(boards)
+
+    # Act
+    counts = batch.mobility(bitboards, colours)
+
+    # Assert
+    assert counts.tolist() == [len(board.legal_moves()) for board in boards]
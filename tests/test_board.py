@@ -1,5 +1,10 @@
-from chessington.engine.board import Board
-from chessington.engine.data import Player, Square
+import pytest
+
+from chessington.engine.board import PACKED_SIZE, STARTING_FEN, Board
+from chessington.engine.data import Move, PieceType, Player, Square
+from chessington.engine.movegen import BLACK_QUEENSIDE, WHITE_KINGSIDE
+from chessington.engine.perft import REFERENCE_POSITIONS
+from chessington.engine.pieces import Pawn, Knight, Queen, King
 
 def test_new_board_has_white_pieces_at_bottom():
 
@@ -35,4 +40,365 @@ def test_pieces_can_be_moved_on_the_board():
     board.move_piece(from_square, to_square)
 
     assert board.get_piece(from_square) is None
-    assert board.get_piece(to_square) is piece
\ No newline at end of file
+    assert board.get_piece(to_square) is piece
+
+def test_starting_position_bitboards():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    white_pawns = board.pieces_bitboard(Player.WHITE, Pawn)
+    black_king = board.pieces_bitboard(Player.BLACK, King)
+
+    # Assert
+    assert white_pawns == 0xFF00
+    assert black_king == 1 << 60
+    assert board.player_bitboard(Player.WHITE) == 0xFFFF
+    assert board.player_bitboard(Player.BLACK) == 0xFFFF << 48
+    assert board.occupied == 0xFFFF00000000FFFF
+
+def test_moving_a_piece_updates_bitboards():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    board.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+    # Assert
+    assert board.pieces_bitboard(Player.WHITE, Pawn) == (0xFF00 ^ (1 << 12)) | (1 << 28)
+    assert board.occupied & (1 << 12) == 0
+    assert board.occupied & (1 << 28)
+
+def test_replacing_a_piece_updates_bitboards():
+
+    # Arrange
+    board = Board.at_starting_position()
+    knight = Knight(Player.WHITE)
+
+    # Act
+    board.set_piece(Square.at(6, 0), knight)
+
+    # Assert
+    assert board.get_piece(Square.at(6, 0)) is knight
+    assert board.pieces_bitboard(Player.BLACK, Pawn) == 0xFE << 48
+    assert board.pieces_bitboard(Player.WHITE, Knight) == 0x42 | (1 << 48)
+    assert board.player_bitboard(Player.BLACK) & (1 << 48) == 0
+
+def test_find_piece_follows_moves():
+
+    # Arrange
+    board = Board.at_starting_position()
+    knight = board.get_piece(Square.at(0, 1))
+
+    # Act
+    board.move_piece(Square.at(0, 1), Square.at(2, 2))
+
+    # Assert
+    assert board.find_piece(knight) == Square.at(2, 2)
+
+def test_captured_piece_is_no_longer_listed():
+
+    # Arrange
+    board = Board.at_starting_position()
+    victim = board.get_piece(Square.at(6, 3))
+
+    # Act
+    board.move_piece(Square.at(1, 4), Square.at(6, 3))
+
+    # Assert
+    assert victim not in board.get_pieces(Player.BLACK, Pawn)
+    assert len(board.get_pieces(Player.BLACK, Pawn)) == 7
+    assert len(board.get_pieces(Player.BLACK)) == 15
+    assert len(board.get_pieces(Player.WHITE)) == 16
+
+def test_starting_position_has_twenty_legal_moves():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    moves = board.legal_moves()
+
+    # Assert
+    assert len(moves) == 20
+    assert Move(Square.at(0, 6), Square.at(2, 5)) in moves
+
+def test_checkmated_player_has_no_legal_moves():
+
+    # Arrange
+    board = Board.at_starting_position()
+    for from_square, to_square in [((1, 5), (2, 5)), ((6, 4), (4, 4)), ((1, 6), (3, 6)), ((7, 3), (3, 7))]:
+        board.move_piece(Square.at(*from_square), Square.at(*to_square))
+
+    # Act
+    moves = board.legal_moves()
+
+    # Assert
+    assert board.is_in_check()
+    assert moves == []
+
+def test_castling_moves_the_rook():
+
+    # Arrange
+    board = Board.at_starting_position()
+    rook = board.get_piece(Square.at(0, 7))
+    board.set_piece(Square.at(0, 5), None)
+    board.set_piece(Square.at(0, 6), None)
+
+    # Act
+    board.move_piece(Square.at(0, 4), Square.at(0, 6))
+
+    # Assert
+    assert board.get_piece(Square.at(0, 5)) is rook
+    assert board.get_piece(Square.at(0, 7)) is None
+
+def test_king_stepping_two_squares_without_a_rook_just_moves():
+
+    # Arrange
+    board = Board.empty()
+    king = King(Player.WHITE)
+    board.set_piece(Square.at(0, 4), king)
+    other_king = King(Player.WHITE)
+    board.set_piece(Square.at(0, 0), other_king)
+
+    # Act
+    board.move_piece(Square.at(0, 4), Square.at(0, 6))
+    board.current_player = Player.WHITE
+    board.move_piece(Square.at(0, 0), Square.at(0, 2))
+
+    # Assert
+    assert board.get_piece(Square.at(0, 6)) is king
+    assert board.get_piece(Square.at(0, 2)) is other_king
+    assert board.get_piece(Square.at(0, 5)) is None
+    assert board.get_piece(Square.at(0, 3)) is None
+    assert board.current_player is Player.BLACK
+    board.pop()
+    board.pop()
+    assert board.get_piece(Square.at(0, 4)) is king
+
+def test_en_passant_removes_the_captured_pawn():
+
+    # Arrange
+    board = Board.at_starting_position()
+    for from_square, to_square in [((1, 4), (3, 4)), ((6, 0), (5, 0)), ((3, 4), (4, 4)), ((6, 3), (4, 3))]:
+        board.move_piece(Square.at(*from_square), Square.at(*to_square))
+
+    # Act
+    board.move_piece(Square.at(4, 4), Square.at(5, 3))
+
+    # Assert
+    assert board.get_piece(Square.at(4, 3)) is None
+    assert len(board.get_pieces(Player.BLACK, Pawn)) == 7
+
+def test_pawn_promotes_to_queen_on_last_row():
+
+    # Arrange
+    board = Board.empty()
+    board.set_piece(Square.at(6, 0), Pawn(Player.WHITE))
+
+    # Act
+    board.move_piece(Square.at(6, 0), Square.at(7, 0))
+
+    # Assert
+    assert isinstance(board.get_piece(Square.at(7, 0)), Queen)
+
+def test_pop_restores_the_position():
+
+    # Arrange
+    board = Board.at_starting_position()
+    before = (list(board.squares), list(board.bitboards), board.castling_rights, board.en_passant)
+    moves = [Move(Square.at(1, 4), Square.at(3, 4)), Move(Square.at(6, 3), Square.at(4, 3)),
+             Move(Square.at(3, 4), Square.at(4, 3)), Move(Square.at(7, 4), Square.at(6, 3))]
+
+    # Act
+    for move in moves:
+        board.push(move)
+    popped = [board.pop() for _ in moves]
+
+    # Assert
+    assert popped == moves[::-1]
+    assert (board.squares, board.bitboards, board.castling_rights, board.en_passant) == before
+    assert board.current_player == Player.WHITE
+    assert board.fullmove_number == 1
+
+def test_pop_restores_promoted_pawn_and_captured_piece():
+
+    # Arrange
+    board = Board.empty()
+    pawn = Pawn(Player.WHITE)
+    knight = Knight(Player.BLACK)
+    board.set_piece(Square.at(6, 0), pawn)
+    board.set_piece(Square.at(7, 1), knight)
+
+    # Act
+    board.push(Move(Square.at(6, 0), Square.at(7, 1), PieceType.KNIGHT))
+    promoted = board.get_piece(Square.at(7, 1))
+    board.pop()
+
+    # Assert
+    assert isinstance(promoted, Knight) and promoted.player == Player.WHITE
+    assert board.get_piece(Square.at(6, 0)) is pawn
+    assert board.get_piece(Square.at(7, 1)) is knight
+
+def test_push_updates_move_clocks():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    board.push(Move(Square.at(0, 6), Square.at(2, 5)))
+    board.push(Move(Square.at(7, 6), Square.at(5, 5)))
+
+    # Assert
+    assert board.halfmove_clock == 2
+    assert board.fullmove_number == 2
+
+def test_transposed_positions_share_a_zobrist_key():
+
+    # Arrange
+    first = Board.at_starting_position()
+    second = Board.at_starting_position()
+
+    # Act
+    for move in [((0, 6), (2, 5)), ((7, 6), (5, 5)), ((0, 1), (2, 2))]:
+        first.move_piece(Square.at(*move[0]), Square.at(*move[1]))
+    for move in [((0, 1), (2, 2)), ((7, 6), (5, 5)), ((0, 6), (2, 5))]:
+        second.move_piece(Square.at(*move[0]), Square.at(*move[1]))
+
+    # Assert
+    assert first.zobrist_key == second.zobrist_key
+    assert first.zobrist_key != Board.at_starting_position().zobrist_key
+
+def test_zobrist_key_covers_side_to_move_and_castling():
+
+    # Arrange
+    board = Board.at_starting_position()
+    key = board.zobrist_key
+
+    # Act
+    board.current_player = Player.BLACK
+    black_to_move = board.zobrist_key
+    board.current_player = Player.WHITE
+    board.castling_rights = 0
+    no_castling = board.zobrist_key
+
+    # Assert
+    assert len({key, black_to_move, no_castling}) == 3
+
+def test_pop_restores_the_zobrist_key():
+
+    # Arrange
+    board = Board.at_starting_position()
+    key = board.zobrist_key
+
+    # Act
+    board.push(Move(Square.at(1, 4), Square.at(3, 4)))
+    board.push(Move(Square.at(6, 3), Square.at(4, 3)))
+    board.push(Move(Square.at(3, 4), Square.at(4, 3)))
+    for _ in range(3):
+        board.pop()
+
+    # Assert
+    assert board.zobrist_key == key
+
+def test_board_starts_with_the_given_player_to_move():
+
+    # Act
+    board = Board(Player.BLACK, Board._create_empty_board())
+
+    # Assert
+    assert board.current_player is Player.BLACK
+
+def test_from_fen_matches_starting_position():
+
+    # Arrange
+    expected = Board.at_starting_position()
+
+    # Act
+    board = Board.from_fen(STARTING_FEN)
+
+    # Assert
+    assert board.zobrist_key == expected.zobrist_key
+    assert (board.mg_score, board.eg_score, board.phase) == (expected.mg_score, expected.eg_score, expected.phase)
+    assert board.occupancy == expected.occupancy
+    assert board.legal_moves() == expected.legal_moves()
+
+def test_fen_round_trips():
+
+    # Arrange
+    fens = [position.fen for position in REFERENCE_POSITIONS] + [
+        'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3',
+        '8/8/8/8/8/8/8/K6k b - - 37 112',
+    ]
+
+    # Act
+    written = [Board.from_fen(fen).to_fen() for fen in fens]
+
+    # Assert
+    assert written == fens
+
+def test_from_fen_reads_side_rights_and_clocks():
+
+    # Act
+    board = Board.from_fen('r3k2r/8/8/3pP3/8/8/8/R3K2R w Kq d6 5 20')
+
+    # Assert
+    assert board.current_player is Player.WHITE
+    assert board.castling_rights == WHITE_KINGSIDE | BLACK_QUEENSIDE
+    assert board.en_passant == Square.at(5, 3).index
+    assert (board.halfmove_clock, board.fullmove_number) == (5, 20)
+
+def test_to_fen_follows_moves():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    board.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+    # Assert
+    assert board.to_fen() == 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1'
+
+@pytest.mark.parametrize('fen', [
+    '',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'rnbqkbnr/ppppxppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkx - 0 1',
+    'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e4 0 1',
+])
+def test_from_fen_rejects_malformed_positions(fen):
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        Board.from_fen(fen)
+
+def test_pack_round_trips():
+
+    # Arrange
+    boards = [Board.from_fen(position.fen) for position in REFERENCE_POSITIONS] + [
+        Board.from_fen('rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3'),
+        Board.from_fen('8/8/8/8/8/8/8/K6k b - - 37 112'),
+    ]
+
+    # Act
+    unpacked = [Board.unpack(board.pack()) for board in boards]
+
+    # Assert
+    assert all(len(board.pack()) == PACKED_SIZE == 32 for board in boards)
+    assert [board.to_fen() for board in unpacked] == [board.to_fen() for board in boards]
+    assert [board.zobrist_key for board in unpacked] == [board.zobrist_key for board in boards]
+    assert [board.mg_score for board in unpacked] == [board.mg_score for board in boards]
+
+def test_pack_rejects_more_than_32_pieces():
+
+    # Arrange
+    board = Board.at_starting_position()
+    board.set_piece(Square.at(3, 3), Queen(Player.WHITE))
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        board.pack()
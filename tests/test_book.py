@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.book import ENTRY, OpeningBook
+from chessington.engine.data import Move, Square
+from chessington.engine.movegen import encode_move
+from chessington.engine.search import search
+from chessington.io.book import build_book
+
+GAMES = [
+    ['e4', 'e5', 'Nf3', 'Nc6'],
+    ['e4', 'c5', 'Nf3'],
+    ['d4', 'd5'],
+]
+
+@pytest.fixture
+def book_path(tmp_path):
+    path = tmp_path / 'book.bin'
+    build_book(GAMES, path)
+    return path
+
+def test_book_is_sorted_fixed_size_entries(book_path):
+
+    # Act
+    data = book_path.read_bytes()
+
+    # Assert
+    entries = [ENTRY.unpack_from(data, offset) for offset in range(0, len(data), ENTRY.size)]
+    assert len(data) % ENTRY.size == 0
+    assert entries == sorted(entries)
+    assert len(entries) == 8
+
+def test_book_lists_weighted_moves_for_position(book_path):
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    with OpeningBook(book_path) as book:
+        entries = book.entries(board)
+
+    # Assert
+    assert entries == [(encode_move(12, 28, flag=3), 2), (encode_move(11, 27, flag=3), 1)]
+
+def test_book_knows_nothing_about_unseen_positions(book_path):
+
+    # Arrange
+    board = Board.at_starting_position()
+    board.move_piece(Square.at(1, 0), Square.at(2, 0))
+
+    # Act
+    with OpeningBook(book_path) as book:
+        move = book.choose(board)
+
+    # Assert
+    assert move is None
+
+def test_search_plays_from_book(book_path):
+
+    # Arrange
+    board = Board.at_starting_position()
+    board.move_piece(Square.at(1, 4), Square.at(3, 4))
+
+    # Act
+    with OpeningBook(book_path) as book:
+        result = search(board, max_depth=3, book=book)
+
+    # Assert
+    assert result.best_move in (Move(Square.at(6, 4), Square.at(4, 4)), Move(Square.at(6, 2), Square.at(4, 2)))
+    assert result.depth == 0
+
+def test_empty_book_can_be_opened(tmp_path):
+
+    # Arrange
+    path = tmp_path / 'empty.bin'
+    build_book([], path)
+
+    # Act
+    with OpeningBook(path) as book:
+        move = book.choose(Board.at_starting_position(), random.Random(1))
+
+    # Assert
+    assert len(book) == 0
+    assert move is None
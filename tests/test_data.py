@@ -0,0 +1,31 @@
+from chessington.engine.data import Square
+
+def test_square_at_returns_shared_instances():
+
+    # Act
+    first = Square.at(3, 4)
+    second = Square.at(3, 4)
+
+    # Assert
+    assert first is second
+    assert Square.from_index(28) is first
+
+def test_constructed_squares_equal_shared_ones():
+
+    # Act
+    square = Square(3, 4)
+
+    # Assert
+    assert square == Square.at(3, 4)
+    assert hash(square) == hash(Square.at(3, 4))
+    assert square.index == 28
+    assert square in {Square.at(3, 4)}
+
+def test_off_board_squares_are_still_available():
+
+    # Act
+    square = Square.at(8, 8)
+
+    # Assert
+    assert (square.row, square.col) == (8, 8)
+    assert square != Square.at(7, 7)
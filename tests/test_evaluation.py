@@ -0,0 +1,44 @@
+from random import Random
+
+from chessington.engine.board import Board
+from chessington.engine.evaluation import MAX_PHASE, evaluate, score_from_scratch
+
+def test_starting_position_is_level():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    score = evaluate(board)
+
+    # Assert
+    assert score == 0
+    assert board.phase == MAX_PHASE
+
+def test_extra_material_is_scored_for_the_side_to_move():
+
+    # Arrange
+    white_to_move = Board.from_fen('4k3/8/8/8/8/8/8/3QK3 w - - 0 1')
+    black_to_move = Board.from_fen('4k3/8/8/8/8/8/8/3QK3 b - - 0 1')
+
+    # Act / Assert
+    assert evaluate(white_to_move) > 800
+    assert evaluate(black_to_move) == -evaluate(white_to_move)
+
+def test_running_totals_match_a_full_rescan():
+
+    # Arrange
+    board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+    initial = score_from_scratch(board)
+    random = Random(7)
+
+    # Act / Assert
+    for _ in range(40):
+        moves = board.legal_moves()
+        if not moves:
+            break
+        board.push(random.choice(moves))
+        assert (board.mg_score, board.eg_score, board.phase) == score_from_scratch(board)
+    while board.move_stack:
+        board.pop()
+    assert (board.mg_score, board.eg_score, board.phase) == initial
@@ -0,0 +1,62 @@
+from chessington.engine.board import Board
+from chessington.engine.data import Move, Square
+from chessington.io.index import PositionIndex, build_index
+from chessington.io.pgn import Game
+
+GAMES = [
+    ['e4', 'e5', 'Nf3'],
+    ['e4', 'c5'],
+    ['d4', 'd5', 'Ke3'],
+]
+
+def test_index_counts_positions_and_the_moves_played_from_them(tmp_path):
+
+    # Arrange
+    board = Board.at_starting_position()
+    after_e4 = Board.from_fen('rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1')
+
+    # Act
+    with PositionIndex(str(tmp_path / 'index.db'), batch_size=2) as index:
+        positions = [index.add_game(Game({}, moves)) for moves in GAMES]
+        start_count = index.count(board)
+        start_moves = index.moves(board)
+        e4_count = index.count(after_e4)
+        distinct = len(index)
+
+    # Assert
+    assert positions == [4, 3, 3]
+    assert start_count == 3
+    assert start_moves == [(Move(Square.at(1, 4), Square.at(3, 4)), 2), (Move(Square.at(1, 3), Square.at(3, 3)), 1)]
+    assert e4_count == 2
+    assert distinct == 7
+
+def test_index_knows_nothing_of_unseen_positions(tmp_path):
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/8/8/8/8/4K3 w - - 0 1')
+
+    # Act
+    with PositionIndex(str(tmp_path / 'index.db')) as index:
+        index.add_game(Game({}, GAMES[0]))
+        count = index.count(board)
+        moves = index.moves(board)
+
+    # Assert
+    assert (count, moves) == (0, [])
+
+def test_build_index_adds_to_an_existing_index(tmp_path):
+
+    # Arrange
+    pgn = tmp_path / 'games.pgn'
+    pgn.write_text('1. e4 e5 *\n\n1. e4 c5 *\n')
+    path = str(tmp_path / 'index.db')
+
+    # Act
+    first = build_index(str(pgn), path)
+    build_index(str(pgn), path)
+    with PositionIndex(path) as index:
+        count = index.count(Board.at_starting_position())
+
+    # Assert
+    assert first == (2, 6)
+    assert count == 4
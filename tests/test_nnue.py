@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from chessington.engine.board import Board
+from chessington.engine.movegen import generate_legal
+from chessington.engine.nnue import Network, NnueEvaluator
+from chessington.engine.perft import REFERENCE_POSITIONS
+from chessington.engine.search import Searcher
+from chessington.engine.tt import TranspositionTable
+
+NETWORK = Network.random(hidden=32)
+
+def test_accumulators_follow_moves_and_take_backs():
+
+    # Arrange
+    board = Board.from_fen(REFERENCE_POSITIONS[1].fen)
+    evaluator = NnueEvaluator(NETWORK, board)
+    rng = random.Random(3)
+
+    # Act
+    for _ in range(20):
+        board.push_encoded(rng.choice(generate_legal(board, board.colour_index())))
+    incremental = evaluator.accumulators.copy()
+    evaluator.refresh()
+
+    # Assert
+    assert np.allclose(incremental, evaluator.accumulators, atol=1e-4)
+
+def test_evaluation_is_the_same_for_either_colour():
+
+    # Arrange
+    white = NnueEvaluator(NETWORK, Board.from_fen('4k3/8/8/3q4/8/2N5/4P3/4K3 w - - 0 1'))
+    black = NnueEvaluator(NETWORK, Board.from_fen('4k3/4p3/2n5/8/3Q4/8/8/4K3 b - - 0 1'))
+
+    # Act
+    scores = white.evaluate(), black.evaluate()
+
+    # Assert
+    assert scores[0] == scores[1]
+
+def test_network_round_trips_through_file(tmp_path):
+
+    # Arrange
+    board = Board.from_fen(REFERENCE_POSITIONS[0].fen)
+    path = tmp_path / 'network.npz'
+
+    # Act
+    NETWORK.save(path)
+    loaded = Network.load(path)
+
+    # Assert
+    assert NnueEvaluator(loaded, board).evaluate() == NnueEvaluator(NETWORK, board).evaluate()
+
+def test_detached_evaluator_stops_following_board():
+
+    # Arrange
+    board = Board.from_fen(REFERENCE_POSITIONS[0].fen)
+    evaluator = NnueEvaluator(NETWORK, board)
+    before = evaluator.accumulators.copy()
+
+    # Act
+    evaluator.detach()
+    board.push_encoded(generate_legal(board, board.colour_index())[0])
+
+    # Assert
+    assert board.observers == []
+    assert np.array_equal(evaluator.accumulators, before)
+
+def test_search_can_use_network_evaluation():
+
+    # Arrange
+    board = Board.from_fen(REFERENCE_POSITIONS[0].fen)
+    evaluator = NnueEvaluator(NETWORK, board)
+    searcher = Searcher(board, TranspositionTable(size_mb=1), evaluate=evaluator.evaluate)
+
+    # Act
+    result = searcher.search(max_depth=2)
+
+    # Assert
+    assert result.best_move in board.legal_moves()
+    assert board.move_stack == []
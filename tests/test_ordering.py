@@ -0,0 +1,65 @@
+from chessington.engine.board import Board
+from chessington.engine.movegen import encode_move, generate_legal
+from chessington.engine.ordering import MoveOrderer
+
+def test_captures_ordered_by_victim_then_attacker():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/2q1r3/3P4/8/8/7K/Q7 w - - 0 1')
+    moves = generate_legal(board, 0)
+
+    # Act
+    ordered = MoveOrderer().order(board, moves, ply=0)
+
+    # Assert
+    pawn_takes_queen = encode_move(35, 42)
+    pawn_takes_rook = encode_move(35, 44)
+    assert ordered[:2] == [pawn_takes_queen, pawn_takes_rook]
+
+def test_table_move_comes_first():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/2q1r3/3P4/8/8/7K/Q7 w - - 0 1')
+    moves = generate_legal(board, 0)
+    quiet = encode_move(15, 14)
+
+    # Act
+    ordered = MoveOrderer().order(board, moves, ply=0, table_move=quiet)
+
+    # Assert
+    assert ordered[0] == quiet
+
+def test_cutoffs_teach_killers_and_history():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/8/8/8/8/R3K3 w - - 0 1')
+    moves = generate_legal(board, 0)
+    orderer = MoveOrderer()
+    killer, historic = encode_move(0, 56), encode_move(4, 3)
+
+    # Act
+    orderer.record_cutoff(historic, quiet=True, depth=3, ply=5, move_number=0)
+    orderer.record_cutoff(killer, quiet=True, depth=1, ply=2, move_number=4)
+    ordered = orderer.order(board, moves, ply=2)
+
+    # Assert
+    assert ordered[:2] == [killer, historic]
+    assert orderer.stats.cutoffs == 2
+    assert orderer.stats.first_move_cutoff_rate == 0.5
+
+def test_captures_only_generation_matches_filtered_legal_moves():
+
+    # Arrange
+    board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+    orderer = MoveOrderer()
+
+    for move in generate_legal(board, 0):
+        board.push_encoded(move)
+
+        # Act
+        captures = generate_legal(board, 1, captures_only=True)
+
+        # Assert
+        expected = [reply for reply in generate_legal(board, 1) if not orderer.is_quiet(board, reply)]
+        assert sorted(captures) == sorted(expected)
+        board.pop_encoded()
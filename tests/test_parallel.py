@@ -0,0 +1,64 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.data import Move, Square
+from chessington.engine.movegen import generate_legal
+from chessington.engine.parallel import ParallelSearcher, SpeedupReport
+from chessington.engine.search import MATE_SCORE, Searcher
+from chessington.engine.tt import TranspositionTable
+
+def test_parallel_search_finds_mate_and_material():
+
+    # Arrange
+    mate = Board.from_fen('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1')
+    material = Board.from_fen('4k3/8/8/3q4/8/8/3R4/3K4 w - - 0 1')
+    key = material.zobrist_key
+
+    # Act
+    with ParallelSearcher(workers=2, table_mb=1) as searcher:
+        mate_result = searcher.search(mate, depth=2)
+        material_result = searcher.search(material, depth=2)
+
+    # Assert
+    assert mate_result.best_move == Move(Square.at(0, 0), Square.at(7, 0))
+    assert mate_result.score == MATE_SCORE - 1
+    assert material_result.best_move == Move(Square.at(1, 3), Square.at(4, 3))
+    assert material_result.principal_variation[0] == material_result.best_move
+    assert material.zobrist_key == key
+
+def test_parallel_search_agrees_with_single_core_search():
+
+    # Arrange
+    fens = ['4k3/8/4p3/3p4/8/8/8/3QK3 w - - 0 1', '6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1']
+    single = [Searcher(Board.from_fen(fen), TranspositionTable(size_mb=1)).search(max_depth=depth)
+              for fen in fens for depth in (1, 2)]
+
+    # Act
+    with ParallelSearcher(workers=2, table_mb=1) as searcher:
+        parallel = [searcher.search(Board.from_fen(fen), depth) for fen in fens for depth in (1, 2)]
+
+    # Assert
+    assert [(result.best_move, result.score) for result in parallel] == \
+        [(result.best_move, result.score) for result in single]
+
+def test_parallel_search_rejects_depth_below_one():
+
+    # Arrange
+    board = Board.at_starting_position()
+    move = generate_legal(board, board.colour_index())[0]
+
+    # Act / Assert
+    with ParallelSearcher(workers=1, table_mb=1) as searcher:
+        with pytest.raises(ValueError):
+            searcher.search(board, 0)
+    with pytest.raises(ValueError):
+        Searcher(board, TranspositionTable(size_mb=1)).search_move(move, 0)
+
+def test_speedup_compares_timings():
+
+    # Act
+    report = SpeedupReport(depth=4, workers=4, single_seconds=8.0, parallel_seconds=2.5,
+                           single_nodes=1000, parallel_nodes=1600)
+
+    # Assert
+    assert report.speedup == 3.2
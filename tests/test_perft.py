@@ -0,0 +1,59 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.perft import REFERENCE_POSITIONS, main
+
+MAX_TEST_NODES = 100000
+
+CASES = [
+    (position.fen, depth, nodes)
+    for position in REFERENCE_POSITIONS
+    for depth, nodes in enumerate(position.node_counts, start=1)
+    if nodes <= MAX_TEST_NODES
+]
+
+@pytest.mark.parametrize('fen, depth, nodes', CASES)
+def test_perft_matches_reference_counts(fen, depth, nodes):
+
+    # Arrange
+    board = Board.from_fen(fen)
+
+    # Act
+    result = board.perft(depth)
+
+    # Assert
+    assert result == nodes
+
+def test_perft_leaves_the_board_unchanged():
+
+    # Arrange
+    board = Board.from_fen(REFERENCE_POSITIONS[1].fen)
+    key = board.zobrist_key
+
+    # Act
+    board.perft(2)
+
+    # Assert
+    assert board.zobrist_key == key
+    assert board.move_stack == []
+
+def test_divide_sums_to_perft():
+
+    # Arrange
+    board = Board.from_fen(REFERENCE_POSITIONS[3].fen)
+
+    # Act
+    counts = board.perft_divide(2)
+
+    # Assert
+    assert sum(counts.values()) == 264
+    assert len(counts) == 6
+
+def test_command_line_reports_success(capsys):
+
+    # Act
+    status = main(['--depth', '2', '--position', 'start'])
+
+    # Assert
+    assert status == 0
+    assert 'ok' in capsys.readouterr().out
@@ -0,0 +1,192 @@
+import io
+
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.movegen import encode_move, parse_san
+from chessington.io.pgn import Game, IllegalMoveError, open_games, read_games, replay, replay_file
+
+PGN = '''[Event "Casual game"]
+[White "Anderssen"]
+[Black "Kieseritzky"]
+[Result "1-0"]
+
+1. e4 e5 2. f4 exf4 {the King's Gambit, accepted} 3. Bc4 Qh4+ (3... d5 4. Bxd5) 4. Kf1 b5?! 1-0
+
+[Event "Second game"]
+
+1. d4 d5 $1 2. c4 *
+'''
+
+def test_parse_san_resolves_pawn_and_piece_moves():
+
+    # Arrange
+    board = Board.at_starting_position()
+
+    # Act
+    pawn_move = parse_san(board, 'e4')
+    knight_move = parse_san(board, 'Nf3')
+
+    # Assert
+    assert pawn_move == encode_move(12, 28, flag=3)
+    assert knight_move == encode_move(6, 21)
+
+def test_parse_san_uses_disambiguation():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/8/8/8/4K3/R6R w - - 0 1')
+
+    # Act
+    move = parse_san(board, 'Rad1')
+
+    # Assert
+    assert move == encode_move(0, 3)
+
+def test_parse_san_reads_castling_and_promotion():
+
+    # Arrange
+    board = Board.from_fen('8/P3k3/8/8/8/8/8/4K2R w K - 0 1')
+
+    # Act
+    castle = parse_san(board, 'O-O')
+    promotion = parse_san(board, 'a8=N+')
+
+    # Assert
+    assert castle == encode_move(4, 6, flag=2)
+    assert promotion == encode_move(48, 56, promotion=1)
+
+def test_parse_san_rejects_ambiguous_and_illegal_moves():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/8/8/8/4K3/R6R w - - 0 1')
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        parse_san(board, 'Rd1')
+    with pytest.raises(ValueError):
+        parse_san(board, 'Qd1')
+
+def test_read_games_keeps_headers_and_main_line():
+
+    # Act
+    games = list(read_games(io.StringIO(PGN)))
+
+    # Assert
+    assert len(games) == 2
+    assert games[0].headers['White'] == 'Anderssen'
+    assert games[0].moves == ['e4', 'e5', 'f4', 'exf4', 'Bc4', 'Qh4+', 'Kf1', 'b5']
+    assert games[1] == Game({'Event': 'Second game'}, ['d4', 'd5', 'c4'])
+
+def test_read_games_yields_each_game_before_reading_the_next():
+
+    # Arrange
+    lines = iter(PGN.splitlines())
+
+    # Act
+    first = next(read_games(lines))
+
+    # Assert
+    assert first.headers['Event'] == 'Casual game'
+    assert '[Event "Second game"]' in list(lines)
+
+def test_read_games_ignores_results_inside_comments():
+
+    # Arrange
+    text = '''[Event "Annotated"]
+
+1. e4 {White could also have
+won with 1-0
+*} e5 2. Nf3 ; not 2. Qh5 0-1
+Nc6 (2... d6 3. d4 1-0) 3. Bb5 1/2-1/2
+'''
+
+    # Act
+    games = list(read_games(io.StringIO(text)))
+
+    # Assert
+    assert len(games) == 1
+    assert games[0].moves == ['e4', 'e5', 'Nf3', 'Nc6', 'Bb5']
+
+def test_read_games_starts_a_new_game_at_tags_after_a_game_without_result():
+
+    # Arrange
+    text = '''[Event "Unfinished"]
+
+1. e4 e5
+
+[Event "Next"]
+
+1. d4 *
+'''
+
+    # Act
+    games = list(read_games(io.StringIO(text)))
+
+    # Assert
+    assert games == [Game({'Event': 'Unfinished'}, ['e4', 'e5']), Game({'Event': 'Next'}, ['d4'])]
+
+def test_open_games_reads_a_file(tmp_path):
+
+    # Arrange
+    path = tmp_path / 'games.pgn'
+    path.write_text(PGN)
+    empty = tmp_path / 'empty.pgn'
+    empty.write_text('')
+
+    # Act
+    games = list(open_games(str(path)))
+
+    # Assert
+    assert games == list(read_games(io.StringIO(PGN)))
+    assert list(open_games(str(empty))) == []
+
+def test_open_games_skips_a_byte_order_mark(tmp_path):
+
+    # Arrange
+    path = tmp_path / 'games.pgn'
+    path.write_bytes(b'\xef\xbb\xbf' + PGN.encode('utf-8'))
+
+    # Act
+    games = list(open_games(str(path)))
+
+    # Assert
+    assert games == list(read_games(io.StringIO(PGN)))
+
+def test_replay_plays_the_moves_from_the_fen_header():
+
+    # Arrange
+    game = Game({'FEN': '4k3/8/8/8/8/8/4K3/R6R w - - 0 1'}, ['Rad1', 'Kf7', 'Rh7+'])
+
+    # Act
+    steps = [(board.to_fen(), move) for board, move in replay(game)]
+
+    # Assert
+    assert steps[0] == ('4k3/8/8/8/8/8/4K3/R6R w - - 0 1', encode_move(0, 3))
+    assert steps[2][1] == encode_move(7, 55)
+
+def test_replay_reports_the_first_illegal_move():
+
+    # Arrange
+    game = Game({}, ['e4', 'e5', 'Ke3'])
+
+    # Act
+    with pytest.raises(IllegalMoveError) as error:
+        list(replay(game))
+
+    # Assert
+    assert error.value.ply == 2
+    assert error.value.san == 'Ke3'
+
+def test_replay_file_counts_games_moves_and_errors(tmp_path):
+
+    # Arrange
+    path = tmp_path / 'games.pgn'
+    path.write_text(PGN + '\n1. e4 e5 2. Ke3 *\n')
+    reported = []
+
+    # Act
+    stats = replay_file(str(path), lambda number, error: reported.append(number))
+
+    # Assert
+    assert (stats.games, stats.moves, stats.errors) == (3, 13, 1)
+    assert reported == [3]
@@ -1,3 +1,5 @@
+import pytest
+
 from chessington.engine.board import Board
 from chessington.engine.data import Player, Square
 from chessington.engine.pieces import *
@@ -44,7 +46,34 @@ class TestKing:
 
     @staticmethod
     def test_king_can_castle():
-        pass
+        # Arrange
+        board = Board.at_starting_position()
+        for col in [1, 2, 3, 5, 6]:
+            board.set_piece(Square.at(0, col), None)
+        king = board.get_piece(Square.at(0, 4))
+
+        # Act
+        moves = king.get_available_moves(board)
+
+        # Assert
+        assert Square.at(0, 6) in moves
+        assert Square.at(0, 2) in moves
+
+    @staticmethod
+    def test_king_cannot_castle_through_check():
+        # Arrange
+        board = Board.at_starting_position()
+        for col in [5, 6]:
+            board.set_piece(Square.at(0, col), None)
+        board.set_piece(Square.at(1, 5), None)
+        board.set_piece(Square.at(4, 5), Rook(Player.BLACK))
+        king = board.get_piece(Square.at(0, 4))
+
+        # Act
+        moves = king.get_available_moves(board)
+
+        # Assert
+        assert Square.at(0, 6) not in moves
 
     @staticmethod
     def test_king_cannot_move_into_check():
@@ -877,3 +906,65 @@ class TestPawns:
         # Assert
         assert Square.at(2, 3) not in moves
         assert Square.at(2, 5) not in moves
+
+
+class TestLegality:
+    @staticmethod
+    def test_pinned_piece_can_only_move_along_the_pin():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        rook = Rook(Player.WHITE)
+        board.set_piece(Square.at(2, 4), rook)
+        board.set_piece(Square.at(6, 4), Queen(Player.BLACK))
+
+        # Act
+        moves = rook.get_available_moves(board)
+
+        # Assert
+        assert Square.at(2, 0) not in moves
+        assert Square.at(5, 4) in moves
+        assert Square.at(6, 4) in moves
+
+    @staticmethod
+    def test_pieces_must_block_or_capture_when_in_check():
+
+        # Arrange
+        board = Board.empty()
+        board.set_piece(Square.at(0, 4), King(Player.WHITE))
+        knight = Knight(Player.WHITE)
+        board.set_piece(Square.at(3, 4), knight)
+        board.set_piece(Square.at(3, 7), Bishop(Player.BLACK))
+
+        # Act
+        moves = knight.get_available_moves(board)
+
+        # Assert
+        assert sorted(moves, key=lambda square: square.row) == [Square.at(1, 5), Square.at(2, 6)]
+
+    @staticmethod
+    def test_pawn_can_capture_en_passant():
+
+        # Arrange
+        board = Board.empty()
+        pawn = Pawn(Player.WHITE)
+        board.set_piece(Square.at(4, 4), pawn)
+        board.set_piece(Square.at(6, 3), Pawn(Player.BLACK))
+        board.current_player = Player.BLACK
+        board.move_piece(Square.at(6, 3), Square.at(4, 3))
+
+        # Act
+        moves = pawn.get_available_moves(board)
+
+        # Assert
+        assert Square.at(5, 3) in moves
+
+
+class TestPiece:
+    @staticmethod
+    def test_piece_needs_a_piece_type():
+
+        # Act / Assert
+        with pytest.raises(TypeError):
+            Piece(Player.WHITE)
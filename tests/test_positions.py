@@ -0,0 +1,77 @@
+import pytest
+
+from chessington.engine.board import PACKED_SIZE, Board
+from chessington.engine.perft import REFERENCE_POSITIONS
+from chessington.engine.positions import PackedPositions
+
+FENS = [position.fen for position in REFERENCE_POSITIONS]
+
+def test_packed_positions_give_back_each_position():
+
+    # Arrange
+    positions = PackedPositions.from_boards(Board.from_fen(fen) for fen in FENS)
+
+    # Act
+    last = positions[-1]
+    second = positions[1]
+
+    # Assert
+    assert len(positions) == len(FENS)
+    assert positions.nbytes == len(FENS) * PACKED_SIZE
+    assert last.to_fen() == FENS[-1]
+    assert second.to_fen() == FENS[1]
+    assert [board.to_fen() for board in positions] == FENS
+
+def test_packed_positions_reject_out_of_range_indexes():
+
+    # Arrange
+    positions = PackedPositions()
+    positions.append(Board.at_starting_position())
+
+    # Act / Assert
+    with pytest.raises(IndexError):
+        positions[1]
+    with pytest.raises(ValueError):
+        PackedPositions(b'\0' * (PACKED_SIZE + 1))
+
+def test_packed_positions_save_and_load(tmp_path):
+
+    # Arrange
+    positions = PackedPositions.from_boards(Board.from_fen(fen) for fen in FENS)
+    path = str(tmp_path / 'positions.bin')
+
+    # Act
+    positions.save(path)
+    loaded = PackedPositions.load(path)
+
+    # Assert
+    assert [board.to_fen() for board in loaded] == FENS
+
+def test_packed_positions_as_numpy_array():
+
+    # Arrange
+    pytest.importorskip('numpy')
+    boards = [Board.from_fen(fen) for fen in FENS]
+    positions = PackedPositions.from_boards(boards)
+
+    # Act
+    array = positions.to_numpy()
+
+    # Assert
+    assert array.shape == (len(FENS),)
+    assert [int(occupied) for occupied in array['occupied']] == [board.occupied for board in boards]
+    assert list(array['fullmove_number']) == [board.fullmove_number for board in boards]
+
+def test_positions_can_be_added_after_to_numpy():
+
+    # Arrange
+    pytest.importorskip('numpy')
+    positions = PackedPositions.from_boards([Board.from_fen(FENS[0])])
+    array = positions.to_numpy()
+
+    # Act
+    positions.append(Board.from_fen(FENS[1]))
+
+    # Assert
+    assert len(positions) == 2
+    assert array.shape == (1,)
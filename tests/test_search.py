@@ -0,0 +1,169 @@
+import threading
+import time
+
+from chessington.engine.board import Board
+from chessington.engine.data import Move, Square
+from chessington.engine import search as search_module
+from chessington.engine.search import MATE_SCORE, Searcher, search
+from chessington.engine.tt import TranspositionTable
+
+class _Clock:
+    """
+    Stands in for the time module in the search: each reading moves the time on by `step` seconds.
+    """
+
+    def __init__(self, step=0.0):
+        self.now = 0.0
+        self.step = step
+
+    def perf_counter(self):
+        now = self.now
+        self.now += self.step
+        return now
+
+def test_search_finds_mate_in_one():
+
+    # Arrange
+    board = Board.from_fen('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1')
+
+    # Act
+    result = search(board, max_depth=3)
+
+    # Assert
+    assert result.best_move == Move(Square.at(0, 0), Square.at(7, 0))
+    assert result.score == MATE_SCORE - 1
+
+def test_search_wins_material():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/8/3q4/8/8/3R4/3K4 w - - 0 1')
+
+    # Act
+    result = search(board, max_depth=2)
+
+    # Assert
+    assert result.best_move == Move(Square.at(1, 3), Square.at(4, 3))
+    assert result.principal_variation[0] == result.best_move
+
+def test_search_reports_no_move_when_stalemated():
+
+    # Arrange
+    board = Board.from_fen('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1')
+
+    # Act
+    result = search(board, max_depth=2)
+
+    # Assert
+    assert result.best_move is None
+    assert result.score == 0
+
+def test_search_honours_deadline_and_restores_board(monkeypatch):
+
+    # Arrange
+    board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+    key = board.zobrist_key
+    searcher = Searcher(board, TranspositionTable(size_mb=1))
+    clock = _Clock(step=0.01)
+    monkeypatch.setattr(search_module, 'time', clock)
+
+    # Act
+    result = searcher.search(time_limit_ms=100)
+
+    # Assert
+    assert clock.now <= 0.15
+    assert result.best_move in board.legal_moves()
+    assert result.nodes > 0
+    assert board.zobrist_key == key
+    assert board.move_stack == []
+
+def test_search_counts_table_allocation_against_deadline(monkeypatch):
+
+    # Arrange
+    board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+    clock = _Clock()
+
+    def slow_table(size_mb):
+        clock.now += 0.01
+        return TranspositionTable(size_mb)
+
+    monkeypatch.setattr(search_module, 'time', clock)
+    monkeypatch.setattr(search_module, 'TranspositionTable', slow_table)
+
+    # Act
+    result = search(board, max_depth=2, time_limit_ms=5)
+
+    # Assert
+    assert result.depth == 0
+    assert result.best_move in board.legal_moves()
+
+def test_fallback_move_is_the_first_move_searched():
+
+    # Arrange
+    board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+
+    # Act
+    fallback = next(Searcher(board, TranspositionTable(size_mb=1)).analyse())
+
+    # Assert
+    assert fallback.depth == 0
+    assert fallback.best_move == Move(Square.at(1, 4), Square.at(5, 0))
+
+def test_quiescence_sees_recapture_beyond_horizon():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/4p3/3p4/8/8/8/3QK3 w - - 0 1')
+
+    # Act
+    result = search(board, max_depth=1)
+
+    # Assert
+    assert result.best_move != Move(Square.at(0, 3), Square.at(4, 3))
+
+def test_analyse_yields_each_iteration():
+
+    # Arrange
+    board = Board.at_starting_position()
+    searcher = Searcher(board, TranspositionTable(size_mb=1))
+
+    # Act
+    results = list(searcher.analyse(max_depth=3))
+
+    # Assert
+    assert [result.depth for result in results] == [0, 1, 2, 3]
+    assert all(result.nodes > 0 and result.nodes_per_second > 0 for result in results[1:])
+    assert results[-1].principal_variation[0] == results[-1].best_move
+
+def test_analyse_can_be_abandoned_between_iterations():
+
+    # Arrange
+    board = Board.at_starting_position()
+    key = board.zobrist_key
+    searcher = Searcher(board, TranspositionTable(size_mb=1))
+
+    # Act
+    for result in searcher.analyse():
+        if result.depth == 2:
+            break
+
+    # Assert
+    assert result.depth == 2
+    assert board.zobrist_key == key
+    assert board.move_stack == []
+
+def test_stop_cancels_search_from_another_thread():
+
+    # Arrange
+    board = Board.from_fen('r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1')
+    searcher = Searcher(board, TranspositionTable(size_mb=1))
+    timer = threading.Timer(0.05, searcher.stop)
+
+    # Act
+    start = time.perf_counter()
+    timer.start()
+    results = list(searcher.analyse())
+    elapsed = time.perf_counter() - start
+
+    # Assert
+    assert elapsed < 1
+    assert results[-1].best_move in board.legal_moves()
+    assert board.move_stack == []
@@ -0,0 +1,36 @@
+from chessington.engine.board import Board
+from chessington.engine.movegen import encode_move
+from chessington.engine.see import static_exchange
+
+def test_winning_capture_of_defended_piece():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/4p3/3q4/4P3/8/8/4K3 w - - 0 1')
+
+    # Act
+    gain = static_exchange(board, encode_move(28, 35))
+
+    # Assert
+    assert gain == 800
+
+def test_losing_capture_of_defended_pawn():
+
+    # Arrange
+    board = Board.from_fen('4k3/8/4p3/3p4/8/8/8/3QK3 w - - 0 1')
+
+    # Act
+    gain = static_exchange(board, encode_move(3, 35))
+
+    # Assert
+    assert gain == -800
+
+def test_piece_behind_capturer_joins_exchange():
+
+    # Arrange
+    board = Board.from_fen('3rk3/8/8/3p4/8/8/3R4/3R2K1 w - - 0 1')
+
+    # Act
+    gain = static_exchange(board, encode_move(11, 35))
+
+    # Assert
+    assert gain == 100
@@ -0,0 +1,110 @@
+import pytest
+
+from chessington.engine.board import Board
+from chessington.engine.data import Move, Square
+from chessington.engine.search import MATE_SCORE, search
+from chessington.engine.tablebase import Tablebases, write_tables
+
+@pytest.fixture(scope='module')
+def tablebases(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('tables')
+    write_tables(str(directory), ['KQK'])
+    with Tablebases(str(directory)) as tables:
+        yield tables
+
+def test_probe_finds_mate_in_one(tablebases):
+
+    # Arrange
+    board = Board.from_fen('k7/8/1K6/8/8/8/7Q/8 w - - 0 1')
+
+    # Act
+    result = tablebases.probe(board)
+
+    # Assert
+    assert (result.wdl, result.plies_to_mate) == (1, 1)
+
+def test_probe_recognises_checkmate(tablebases):
+
+    # Arrange
+    board = Board.from_fen('k6Q/8/1K6/8/8/8/8/8 b - - 0 1')
+
+    # Act
+    result = tablebases.probe(board)
+
+    # Assert
+    assert (result.wdl, result.plies_to_mate) == (-1, 0)
+
+def test_probe_swaps_colours_when_black_has_the_queen(tablebases):
+
+    # Arrange
+    board = Board.from_fen('8/7q/8/8/8/1k6/8/K7 b - - 0 1')
+
+    # Act
+    result = tablebases.probe(board)
+
+    # Assert
+    assert (result.wdl, result.plies_to_mate) == (1, 1)
+
+def test_probe_gives_same_answer_for_mirrored_positions(tablebases):
+
+    # Arrange
+    boards = [Board.from_fen(fen) for fen in [
+        '8/8/3k4/8/8/8/1Q6/6K1 w - - 0 1',
+        '8/8/4k3/8/8/8/6Q1/1K6 w - - 0 1',
+        '6K1/1Q6/8/8/8/3k4/8/8 w - - 0 1',
+    ]]
+
+    # Act
+    results = [tablebases.probe(board) for board in boards]
+
+    # Assert
+    assert results[0].wdl == 1
+    assert results[0] == results[1] == results[2]
+
+def test_probe_sees_queen_can_be_taken(tablebases):
+
+    # Arrange
+    board = Board.from_fen('k7/1Q6/8/8/8/8/8/6K1 b - - 0 1')
+
+    # Act
+    result = tablebases.probe(board)
+
+    # Assert
+    assert result.wdl == 0
+
+def test_probe_declines_uncovered_material(tablebases):
+
+    # Arrange
+    board = Board.from_fen('k7/8/1K6/8/8/8/8/7R w - - 0 1')
+
+    # Act
+    result = tablebases.probe(board)
+
+    # Assert
+    assert result is None
+    assert tablebases.materials == ['KQK']
+
+def test_search_plays_mate_from_tablebases(tablebases):
+
+    # Arrange
+    board = Board.from_fen('k7/8/1K6/8/8/8/7Q/8 w - - 0 1')
+
+    # Act
+    result = search(board, max_depth=1, tablebases=tablebases)
+
+    # Assert
+    assert result.score == MATE_SCORE - 1
+    assert result.best_move == Move(Square.at(1, 7), Square.at(7, 7))
+
+def test_write_tables_generates_promotion_tables_for_pawn_endings(tmp_path):
+
+    # Arrange
+    board = Board.from_fen('8/4P3/8/8/8/8/k7/4K3 w - - 0 1')
+
+    # Act
+    write_tables(str(tmp_path), ['KPK'])
+
+    # Assert
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['KPK.tb', 'KQK.tb', 'KRK.tb']
+    with Tablebases(str(tmp_path)) as tables:
+        assert tables.probe(board).wdl == 1
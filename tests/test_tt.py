@@ -0,0 +1,66 @@
+from chessington.engine.tt import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+def test_stored_entries_can_be_probed():
+
+    # Arrange
+    table = TranspositionTable(size_mb=1)
+
+    # Act
+    table.store(0x1234, depth=5, score=-150, bound=LOWER_BOUND, move=777)
+    entry = table.probe(0x1234)
+
+    # Assert
+    assert (entry.move, entry.score, entry.depth, entry.bound) == (777, -150, 5, LOWER_BOUND)
+    assert table.probe(0x4321) is None
+    assert (table.stats.hits, table.stats.misses) == (1, 1)
+
+def test_table_size_is_fixed_by_megabytes():
+
+    # Act
+    table = TranspositionTable(size_mb=2)
+
+    # Assert
+    assert table.memory_bytes() == 2 * 1024 * 1024
+
+def test_deeper_entry_survives_shallower_store_in_same_bucket():
+
+    # Arrange
+    table = TranspositionTable(size_mb=1)
+    deep, shallow, newest = 3, 3 + table.buckets, 3 + 2 * table.buckets
+
+    # Act
+    table.store(deep, depth=8, score=10, bound=EXACT)
+    table.store(shallow, depth=2, score=20, bound=EXACT)
+    table.store(newest, depth=1, score=30, bound=UPPER_BOUND)
+
+    # Assert
+    assert table.probe(deep).score == 10
+    assert table.probe(shallow) is None
+    assert table.probe(newest).score == 30
+    assert table.stats.collisions == 1
+
+def test_new_search_lets_stale_entries_be_replaced():
+
+    # Arrange
+    table = TranspositionTable(size_mb=1)
+    old, new = 7, 7 + table.buckets
+    table.store(old, depth=9, score=1, bound=EXACT)
+
+    # Act
+    table.new_search()
+    table.store(new, depth=1, score=2, bound=EXACT)
+
+    # Assert
+    assert table.probe(new).score == 2
+    assert table.probe(old).score == 1
+
+def test_scores_are_clamped_to_sixteen_bits():
+
+    # Arrange
+    table = TranspositionTable(size_mb=1)
+
+    # Act
+    table.store(99, depth=1, score=10 ** 6, bound=EXACT)
+
+    # Assert
+    assert table.probe(99).score == 32767
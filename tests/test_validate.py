@@ -0,0 +1,69 @@
+import json
+
+from chessington.io.pgn import Game
+from chessington.io.validate import main, validate_file, validate_game
+
+GAMES = '''[White "Amateur"]
+[Black "Scholar"]
+[Result "0-1"]
+
+1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 0-1
+
+[White "Careless"]
+
+1. e4 e5 2. Ke3 *
+
+[White "Third"]
+
+1. d4 d5 2. c4 dxc4 *
+'''
+
+def test_validate_game_counts_captures_and_checks():
+
+    # Act
+    report = validate_game(1, Game({'White': 'Amateur'}, ['e4', 'e5', 'Bc4', 'Nc6', 'Qh5', 'Nf6', 'Qxf7#']))
+
+    # Assert
+    assert (report.plies, report.captures, report.checks) == (7, 1, 1)
+    assert report.error is None
+    assert report.final_fen == 'r1bqkb1r/pppp1Qpp/2n2n2/4p3/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 0 4'
+
+def test_validate_game_reports_illegal_moves():
+
+    # Act
+    report = validate_game(2, Game({}, ['e4', 'e5', 'Ke3']))
+
+    # Assert
+    assert report.plies == 2
+    assert 'Ke3' in report.error
+    assert report.final_fen == 'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2'
+
+def test_validate_file_keeps_the_order_of_the_file_across_workers(tmp_path):
+
+    # Arrange
+    path = tmp_path / 'games.pgn'
+    path.write_text(GAMES * 3)
+
+    # Act
+    reports = list(validate_file(str(path), workers=2, chunk_size=1))
+
+    # Assert
+    assert [report.number for report in reports] == list(range(1, 10))
+    assert [report.white for report in reports] == ['Amateur', 'Careless', 'Third'] * 3
+    assert [report.error is None for report in reports] == [True, False, True] * 3
+
+def test_main_writes_a_json_line_per_game(tmp_path):
+
+    # Arrange
+    path = tmp_path / 'games.pgn'
+    path.write_text(GAMES)
+    output = tmp_path / 'reports.jsonl'
+
+    # Act
+    status = main([str(path), str(output), '--workers', '1'])
+
+    # Assert
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert status == 1
+    assert [line['number'] for line in lines] == [1, 2, 3]
+    assert lines[2]['captures'] == 1